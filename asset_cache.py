@@ -0,0 +1,83 @@
+import pygame
+
+class AssetCache:
+    def __init__(self):
+        self.images = {}
+        self.image_sets = {}
+        self.fonts = {}
+        self.sounds = {}
+
+    def _prepare(self, surface, alpha):
+        # Match the display pixel format once so blits don't convert every frame
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def image(self, path, size=None, fallback=None, alpha=True):
+        key = (path, size)
+        surface = self.images.get(key)
+        if surface is not None:
+            return surface
+
+        try:
+            if size is None:
+                surface = self._prepare(pygame.image.load(path), alpha)
+            else:
+                # Scale from the cached original so each file is decoded once
+                original = self.image(path, None, alpha=alpha)
+                surface = pygame.transform.scale(original, size)
+        except Exception:
+            if fallback is None:
+                raise
+            surface = fallback(size)
+
+        self.images[key] = surface
+        return surface
+
+    def image_set(self, paths, size=None, fallback=None):
+        # A name -> surface dict shared by everyone asking for the same files and size
+        key = (tuple(sorted(paths.items())), size)
+        images = self.image_sets.get(key)
+        if images is None:
+            images = {}
+            for name, path in paths.items():
+                name_fallback = (lambda s, name=name: fallback(name, s)) if fallback else None
+                images[name] = self.image(path, size, name_fallback)
+            self.image_sets[key] = images
+        return images
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            try:
+                font = pygame.font.Font(path, size)
+            except Exception:
+                font = pygame.font.Font(None, size)
+            self.fonts[key] = font
+        return font
+
+    def sound(self, path, volume=None, loader=None):
+        sound = self.sounds.get(path)
+        if sound is None:
+            sound = (loader or pygame.mixer.Sound)(path)
+            if volume is not None:
+                sound.set_volume(volume)
+            self.sounds[path] = sound
+        return sound
+
+    def evict_size(self, size):
+        # Drop everything scaled for a resolution we no longer render at
+        for key in [key for key in self.images if key[1] == size]:
+            del self.images[key]
+        for key in [key for key in self.image_sets if key[1] == size]:
+            del self.image_sets[key]
+
+    def clear(self):
+        self.images.clear()
+        self.image_sets.clear()
+        self.fonts.clear()
+        self.sounds.clear()
+
+# Process-wide registry shared by every game object
+assets = AssetCache()
@@ -0,0 +1,109 @@
+import os
+import random
+import numpy as np
+import pygame
+import pygame.sndarray
+from asset_cache import assets
+
+# Mixer format. 512 frames is ~12 ms of latency at 44.1 kHz (pygame's old
+# 2048 was ~46 ms, long enough to hear the slice after the blade passed).
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+# Decoded PCM is cached here, one .npy per sound and mixer format
+PCM_CACHE_DIR = os.path.join('sounds', 'cache')
+
+_mixer_buffer = None
+
+def pre_init_mixer(buffer=MIXER_BUFFER):
+    # Call before pygame.init() so the mixer opens in our format straight away
+    global _mixer_buffer
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, buffer)
+    _mixer_buffer = buffer
+
+def init_mixer(buffer=MIXER_BUFFER):
+    # Opens the mixer, or reopens it if it's running with a different buffer
+    if pygame.mixer.get_init():
+        if _mixer_buffer == buffer:
+            return
+        pygame.mixer.quit()
+        assets.sounds.clear()  # Sounds don't survive the mixer they were made for
+    pre_init_mixer(buffer)
+    pygame.mixer.init()
+
+def pcm_cache_path(path):
+    frequency, size, channels = pygame.mixer.get_init()
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(PCM_CACHE_DIR, f'{name}.{frequency}_{size}_{channels}.npy')
+
+def decode_sound(path):
+    # MP3s are decoded once per install: the samples are kept as raw PCM at the
+    # mixer's format and rebuilt from that on every later start
+    cache_path = pcm_cache_path(path)
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return pygame.sndarray.make_sound(np.load(cache_path))
+    except (OSError, ValueError):
+        pass
+    sound = pygame.mixer.Sound(path)
+    try:
+        os.makedirs(PCM_CACHE_DIR, exist_ok=True)
+        temp_path = cache_path + '.tmp.npy'
+        np.save(temp_path, pygame.sndarray.array(sound))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Error caching {path}: {e}")
+    return sound
+
+class SliceVoices:
+    # Slice sounds on a pool of reserved mixer channels. Slices are collected
+    # during a frame and played together by flush(): a multi-fruit slice
+    # becomes at most `max_layers` layered samples played a little louder,
+    # rather than one play per fruit. When every voice is busy the oldest is
+    # stolen, so a hit always sounds right away.
+    def __init__(self, sounds, voices=4, max_layers=2, volume=0.5, layer_boost=0.25):
+        self.sounds = sounds
+        self.max_layers = max_layers
+        self.volume = volume
+        self.layer_boost = layer_boost  # Extra volume per slice merged into a frame's sound
+
+        # Channels [0, voices) are ours, Sound.play() elsewhere never takes them
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), voices + 8))
+        pygame.mixer.set_reserved(voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+        self.started = [0] * voices  # Play counter at each channel's last start
+        self.plays = 0
+
+        self.pending = 0
+        self.played = 0
+        self.merged = 0
+        self.stolen = 0
+
+    def trigger(self):
+        self.pending += 1
+
+    def voice(self):
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+        self.stolen += 1
+        return min(range(len(self.channels)), key=self.started.__getitem__)
+
+    def flush(self):
+        # Plays this frame's slices; call once per frame
+        if not self.pending or not self.sounds:
+            self.pending = 0
+            return
+        layers = min(self.pending, self.max_layers, len(self.sounds))
+        volume = min(1.0, self.volume * (1 + self.layer_boost * (self.pending - 1)))
+        for sound in random.sample(self.sounds, layers):
+            i = self.voice()
+            self.plays += 1
+            self.started[i] = self.plays
+            self.channels[i].play(sound)
+            self.channels[i].set_volume(volume)  # play() resets it
+        self.played += layers
+        self.merged += self.pending - layers
+        self.pending = 0
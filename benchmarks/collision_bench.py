@@ -0,0 +1,55 @@
+import os
+import sys
+import math
+import time
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from collision import CollisionSystem
+
+def legacy_hits(segment, centers, radius):
+    # The old check: infinite-line distance against the last segment only
+    (x1, y1), (x2, y2) = segment
+    dx, dy = x2 - x1, y2 - y1
+    length = math.sqrt(dx * dx + dy * dy)
+    return [i for i, (x, y) in enumerate(centers)
+            if abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length < radius]
+
+def make_scene(rng, fruits, segments, width=1920, height=1080):
+    centers = rng.uniform((0, 0), (width, height), (fruits, 2))
+    prev_centers = centers - rng.uniform((-4, -30), (4, 30), (fruits, 2))
+    # A blade stroke: short consecutive moves like the ones BladeTrail produces
+    steps = rng.uniform(-80, 80, (segments, 2))
+    points = np.vstack(([width / 2, height / 2], width / 2 + np.cumsum(steps, axis=0)))
+    blade = [(tuple(points[i]), tuple(points[i + 1])) for i in range(segments)]
+    return centers, prev_centers, blade
+
+def time_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collision broad/narrow phase micro-benchmark")
+    parser.add_argument('--fruits', type=int, nargs='+', default=[8, 64, 256, 1024])
+    parser.add_argument('--segments', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    system = CollisionSystem()
+    brute = CollisionSystem(grid_threshold=sys.maxsize)
+
+    print(f"{'fruits':>8} {'legacy us':>10} {'brute us':>10} {'grid us':>10} {'hits':>6}")
+    for count in args.fruits:
+        centers, prev_centers, blade = make_scene(rng, count, args.segments)
+        center_list = centers.tolist()
+        legacy = time_call(lambda: legacy_hits(blade[-1], center_list, 35), args.repeats)
+        brute_us = time_call(lambda: brute.find_hits(blade, centers, prev_centers, 35), args.repeats)
+        grid_us = time_call(lambda: system.find_hits(blade, centers, prev_centers, 35), args.repeats)
+        hits = len(system.find_hits(blade, centers, prev_centers, 35))
+        print(f"{count:>8} {legacy:>10.1f} {brute_us:>10.1f} {grid_us:>10.1f} {hits:>6}")
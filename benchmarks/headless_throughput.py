@@ -0,0 +1,36 @@
+import os
+import sys
+import argparse
+
+# Run from anywhere: assets are loaded relative to the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from fruit_ninja_enhanced import FruitNinja
+
+def run_scenario(active_fruits, frames, source):
+    pygame.init()
+    game = FruitNinja(source=source, headless=True, min_fruits=active_fruits, max_fruits=max(active_fruits * 2, 8))
+    return game.run(frames)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless game loop throughput")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--fruits', type=int, nargs='+', default=[3, 10, 30])
+    parser.add_argument('--source', default='synthetic:swipe')
+    args = parser.parse_args()
+
+    results = []
+    for count in args.fruits:
+        print(f"--- {count} active fruits ---")
+        results.append((count, run_scenario(count, args.frames, args.source)))
+
+    print()
+    print(f"{'fruits':>8} {'fps':>10} {'fruits/s':>12} {'particles/s':>14} {'blade pts/s':>12}")
+    for count, report in results:
+        print(f"{count:>8} {report['fps']:>10.1f} {report['fruits_per_s']:>12.0f} "
+              f"{report['particles_per_s']:>14.0f} {report['blade_points_per_s']:>12.0f}")
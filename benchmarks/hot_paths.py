@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import numpy as np
+
+# Run from anywhere: assets are loaded relative to the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import cv2
+import pygame
+from fruit_ninja_enhanced import FruitNinja
+from frame_sources import open_frame_source
+from game_objects import BladeTrail
+from fruit_world import FruitWorld
+from particles import particle_pool
+from pools import RingBuffer
+
+class Scenario:
+    # One timed call of `run` is one iteration doing `ops` units of work;
+    # `prepare` (untimed) puts the state back before each iteration
+    def __init__(self, name, run, ops=1, prepare=None):
+        self.name = name
+        self.run = run
+        self.ops = ops
+        self.prepare = prepare
+
+def measure(scenario, iterations, warmup):
+    for _ in range(warmup):
+        if scenario.prepare:
+            scenario.prepare()
+        scenario.run()
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        if scenario.prepare:
+            scenario.prepare()
+        start = time.perf_counter()
+        scenario.run()
+        samples[i] = time.perf_counter() - start
+    total = samples.sum()
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99)) * 1000
+    return {
+        'iterations': iterations,
+        'ops_per_iteration': scenario.ops,
+        'ops_per_s': scenario.ops * iterations / total if total > 0 else 0.0,
+        'mean_ms': samples.mean() * 1000,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': samples.max() * 1000
+    }
+
+def fruit_field(game, count, spread=1.0):
+    # A world of `count` fruits, launched mid-flight over the middle of the screen
+    fruits = FruitWorld(count, game.screen_width, game.screen_height)
+    relaunch_field(fruits, game, spread)
+    return fruits
+
+def relaunch_field(fruits, game, spread=1.0):
+    fruits.spawn(game.game_clock.get_ticks(), fruits.capacity)
+    w, h = game.screen_width * spread, game.screen_height * spread
+    i = np.arange(fruits.capacity)
+    fruits.x0[:] = fruits.x[:] = fruits.prev_x[:] = (game.screen_width - w) / 2 + (i * 97) % int(w)
+    fruits.y0[:] = fruits.y[:] = fruits.prev_y[:] = (game.screen_height - h) / 2 + (i * 53) % int(h)
+    fruits.t0[:] = game.game_clock.get_ticks()
+
+def build_scenarios(game, frames_dir):
+    scenarios = []
+    screen = game.screen
+    queue = game.queue  # Draws are queued and flushed with one blits() call per layer
+
+    # FruitWorld.update/draw with N fruits in the air, one simulated frame later each time
+    clock = game.game_clock
+    for count in (8, 64, 256, 4096):
+        fruits = fruit_field(game, count)
+        def update_draw(fruits=fruits):
+            clock.advance()
+            now = clock.get_ticks()
+            fruits.update(now)
+            fruits.draw(queue, now)
+            queue.flush()
+        scenarios.append(Scenario(f'fruit_update_draw/{count}', update_draw, count,
+                                  lambda fruits=fruits: relaunch_field(fruits, game)))
+
+    # FruitWorld.update alone: the vectorized physics, off-screen checks and respawns
+    for count in (256, 4096):
+        fruits = fruit_field(game, count)
+        def update(fruits=fruits):
+            clock.advance()
+            fruits.update(clock.get_ticks())
+        scenarios.append(Scenario(f'fruit_update/{count}', update, count,
+                                  lambda fruits=fruits: relaunch_field(fruits, game)))
+
+    # Particle storm: a burst of slices on top of an already busy pool
+    storm = fruit_field(game, 40)
+    def storm_frame():
+        for slot in range(40):
+            storm.slice(slot, 0, 30.0)
+        particle_pool.update()
+        particle_pool.draw(queue)
+        queue.flush()
+    scenarios.append(Scenario('particle_storm/40', storm_frame, 40, particle_pool.clear))
+
+    # BladeTrail.draw at several trail lengths
+    for length in (4, 10, 32):
+        blade = BladeTrail(game.screen_width, game.screen_height, game.game_clock)
+        blade.points = RingBuffer(length)
+        for i in range(length):
+            t = i / max(length - 1, 1)
+            blade.points.append((200 + 600 * t, 400 + 150 * math.sin(t * math.pi * 2)))
+        def draw_blade(blade=blade):
+            blade.draw(queue)
+            queue.flush()
+        scenarios.append(Scenario(f'blade_trail_draw/{length}', draw_blade, length))
+
+    # FruitNinja.check_collisions against dense fruit fields, one long swipe
+    swipe = [[((100 + 80 * i, 300 + 20 * i), (180 + 80 * i, 320 + 20 * i)) for i in range(10)]]
+    for count in (16, 256):
+        fruits = fruit_field(game, count, spread=0.5)
+        def arm_collisions(fruits=fruits):
+            game.fruits = fruits
+            relaunch_field(fruits, game, spread=0.5)
+            particle_pool.clear()
+        scenarios.append(Scenario(f'check_collisions/{count}', lambda: game.check_collisions(swipe),
+                                  count, arm_collisions))
+
+    # GameEngine.draw_katana sweeping through angles
+    angles = iter(range(10 ** 9))
+    def katana():
+        game.engine.draw_katana(queue, (500, 400), next(angles) * 7 % 360)
+        queue.flush()
+    scenarios.append(Scenario('draw_katana', katana))
+
+    # Camera frame to preview surface
+    camera_frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    scenarios.append(Scenario('frame_to_surface', lambda: game.frame_to_surface(camera_frame)))
+
+    # HandTracker on recorded frames (blank frames, i.e. the full-frame search, without a recording)
+    try:
+        from hand_tracking import HandTracker, HandTrack
+    except ImportError as e:
+        print(f"Skipping hand tracking: {e}")
+        return scenarios
+    
+    # HandTrack smoothing and velocity, one detection per call
+    track = HandTrack()
+    wiggle = iter(range(10 ** 9))
+    def observe():
+        i = next(wiggle)
+        track.observe(0.5 + (i % 9) * 0.01, 0.5 - (i % 5) * 0.01, (0.2, 0.2))
+    scenarios.append(Scenario('hand_track_observe', observe))
+    
+    # Full-frame video-mode tracking against crops around the predicted hand
+    # (mediapipe is only imported once a tracker is built)
+    try:
+        tracker = HandTracker()
+        roi_tracker = HandTracker(roi_tracking=True)
+    except ImportError as e:
+        print(f"Skipping hand tracking: {e}")
+        return scenarios
+    if frames_dir:
+        source = open_frame_source(frames_dir)
+        recorded = []
+        while len(recorded) < 300:
+            ret, frame = source.read()
+            if not ret:
+                break
+            recorded.append(cv2.flip(frame, 1))
+        source.release()
+    else:
+        recorded = [np.full((480, 640, 3), 40, dtype=np.uint8)]
+    for name, hand_tracker in (('hand_tracking', tracker), ('hand_tracking/roi', roi_tracker)):
+        frame_index = iter(range(10 ** 9))
+        scenarios.append(Scenario(name, lambda hand_tracker=hand_tracker, frame_index=frame_index:
+                                  hand_tracker.get_hand_position(recorded[next(frame_index) % len(recorded)])))
+    return scenarios
+
+def compare(results, baseline, tolerance):
+    # A scenario regresses when its median latency grew by more than `tolerance`
+    regressions = []
+    print(f"{'scenario':<26} {'p50 ms':>10} {'base ms':>10} {'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<26} {result['p50_ms']:>10.3f} {'-':>10} {'new':>9}")
+            continue
+        change = result['p50_ms'] / base['p50_ms'] - 1 if base['p50_ms'] > 0 else 0.0
+        flag = '  REGRESSION' if change > tolerance else ''
+        print(f"{name:<26} {result['p50_ms']:>10.3f} {base['p50_ms']:>10.3f} {change:>+8.1%}{flag}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the game's hot paths")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--filter', default=None, help='only run scenarios whose name contains this')
+    parser.add_argument('--frames-dir', default=None,
+                        help='recorded camera frames (directory or video) for the hand tracking scenario')
+    parser.add_argument('--output', default=None, metavar='PATH', help='write results as JSON')
+    parser.add_argument('--baseline', default=None, metavar='PATH',
+                        help='compare against a previous --output; exits 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed p50 slowdown against the baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    # The game provides the display, engine and clock; seed 0 keeps fruit spawns repeatable
+    game = FruitNinja(source='synthetic', headless=True, seed=0)
+    scenarios = [s for s in build_scenarios(game, args.frames_dir) if not args.filter or args.filter in s.name]
+
+    results = {}
+    print(f"{'scenario':<26} {'ops/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for scenario in scenarios:
+        result = measure(scenario, args.iterations, args.warmup)
+        results[scenario.name] = result
+        print(f"{scenario.name:<26} {result['ops_per_s']:>12.0f} {result['p50_ms']:>10.3f} "
+              f"{result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'pygame': pygame.version.ver,
+                    'numpy': np.__version__,
+                    'iterations': args.iterations
+                },
+                'scenarios': results
+            }, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['scenarios']
+        print()
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
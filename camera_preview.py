@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pygame
+from hand_tracking import HandTracker
+
+class CameraPreview:
+    # Camera thumbnail that lives in one persistent Surface. Frames are shrunk
+    # first, annotated at preview size and converted straight into the pixel
+    # buffer the Surface was created over, so nothing is allocated per update.
+    def __init__(self, size=(320, 240), fps=30):
+        self.size = size
+        self.small = np.zeros((size[1], size[0], 3), dtype=np.uint8)  # BGR, preview size
+        self.rgb = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.rgb, size, 'RGB')  # Shares self.rgb's memory
+        self.set_fps(fps)
+        self.last_update = None
+        self.updates = 0
+
+    def set_fps(self, fps):
+        self.interval_ms = 1000.0 / fps if fps else 0
+
+    def due(self, now_ms):
+        return self.last_update is None or now_ms - self.last_update >= self.interval_ms
+
+    def update(self, frame, hand_pos=None, velocity=None, now_ms=None, other_hands=()):
+        # Returns True if the preview changed. other_hands are further players'
+        # (x, y, speed, velocity) tuples, marked only when present.
+        if now_ms is not None:
+            if not self.due(now_ms):
+                return False
+            self.last_update = now_ms
+        cv2.resize(frame, self.size, dst=self.small)
+        if hand_pos is not None:
+            HandTracker.draw_tracking_info(self.small, hand_pos, velocity)
+        for x, y, _, vel in other_hands:
+            if x is not None:
+                HandTracker.draw_tracking_info(self.small, (x, y), vel)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        self.updates += 1
+        return True
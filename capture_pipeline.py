@@ -0,0 +1,240 @@
+import cv2
+import time
+import threading
+from collections import deque
+from motion_model import InferenceSchedule, frame_velocity
+
+# (x, y, speed, velocity) of a player slot with no hand in it
+NO_HAND = (None, None, 0, (0, 0))
+
+class HandSample:
+    def __init__(self, sequence, frame, hands, capture_time, inference_time, uncertainties=None):
+        self.sequence = sequence
+        self.frame = frame
+        self.hands = hands  # (x, y, speed, velocity) per player slot
+        # First player's hand, for single-player code
+        self.hand_x, self.hand_y, self.velocity, self.vel_vector = hands[0]
+        self.capture_time = capture_time  # Pipeline time (seconds) when the frame was read
+        self.inference_time = inference_time  # Pipeline time when tracking finished
+        # Motion model position std. dev. (frame units) per slot, if any
+        self.uncertainties = uncertainties
+        self.uncertainty = uncertainties[0] if uncertainties else None
+
+class LatestFrameBuffer:
+    def __init__(self, capacity=2):
+        self.frames = deque(maxlen=capacity)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.condition:
+            # Oldest frame falls out when the consumer can't keep up
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(item)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.frames and not self.closed:
+                self.condition.wait(timeout)
+            if not self.frames:
+                return None
+            # Latest frame wins, anything older is stale by now
+            item = self.frames.pop()
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            return item
+
+    def depth(self):
+        with self.condition:
+            return len(self.frames)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+class CapturePipeline:
+    def __init__(self, cap, tracker, buffer_size=2, pace=True, threaded=True,
+                 motion_model=None, infer_every=1, infer_hz=None, clock=None):
+        self.cap = cap
+        self.tracker = tracker
+        # With a motion model (a factory, one filter per player slot), only scheduled
+        # frames get inference and every latest_sample() call gets fresh positions
+        # extrapolated to "now"
+        self.motion_model = motion_model
+        self.hand_count = cap.hands if cap.provides_hand_position else tracker.max_hands
+        self.filters = [motion_model() for _ in range(self.hand_count)] if motion_model else []
+        self.schedule = InferenceSchedule(infer_every, infer_hz)
+        # Replay recorded/synthetic sources at their own frame rate instead of flat out
+        self.pace = pace
+        # Without threads every latest_sample() call reads and tracks one frame inline
+        self.threaded = threaded
+        # Inline pipelines time captures, the inference schedule and the motion
+        # model on the game clock, so headless runs don't depend on wall time
+        self.clock = clock if not threaded else None
+        self.buffer = LatestFrameBuffer(buffer_size)
+        self.lock = threading.Lock()
+        self.running = False
+        self.threads = []
+
+        self.latest = None
+        self.last_consumed = 0
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.read_failures = 0
+        self.read_ms = 0.0  # Duration of the last cap.read()
+        self.inference_ms = 0.0  # Duration of the last hand tracking call
+
+        # Capture-to-render latency in milliseconds
+        self.latency_ms = 0.0
+        self.avg_latency_ms = 0.0
+        self.latency_smoothing = 0.1
+        self.uncertainty = None  # Latest motion model position std. dev.
+
+    def start(self):
+        if not self.threaded:
+            return
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        self.buffer.close()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+    def now(self):
+        # Seconds on the game clock when there is one, otherwise wall time
+        if self.clock is not None:
+            return self.clock.get_ticks() / 1000
+        return time.perf_counter()
+
+    def _read_frame(self):
+        start = time.perf_counter()
+        ret, frame = self.cap.read()
+        self.read_ms = (time.perf_counter() - start) * 1000
+        if not ret:
+            self.read_failures += 1
+            return None
+        frame = cv2.flip(frame, 1)
+        # Synthetic sources already know where the hands are
+        hands = self.cap.hand_positions() if self.cap.provides_hand_position else None
+        self.frames_captured += 1
+        return self.frames_captured, self.now(), frame, hands
+
+    def _track(self, item):
+        sequence, capture_time, frame, hands = item
+        if self.motion_model is not None and not self.schedule.due(capture_time):
+            # Skipped frame: keep it for the preview, the motion model supplies the hands
+            with self.lock:
+                previous = self.latest
+                self.latest = HandSample(sequence, frame, [NO_HAND] * self.hand_count, capture_time,
+                                         previous.inference_time if previous else capture_time)
+            return
+        start = time.perf_counter()
+        try:
+            if hands is None:
+                hands = self.tracker.get_hands(frame)
+                # The filters want raw detections, not the tracker's smoothed/predicted points
+                measurements = self.tracker.raw_points
+            else:
+                measurements = [hand[:2] if hand[0] is not None else None for hand in hands]
+        except Exception as e:
+            print(f"Error tracking hand: {e}")
+            return
+        self.inference_ms = (time.perf_counter() - start) * 1000
+        sample = HandSample(sequence, frame, hands, capture_time, self.now())
+        with self.lock:
+            for model, measurement in zip(self.filters, measurements):
+                if measurement is not None:
+                    model.update(capture_time, measurement[0], measurement[1])
+            self.latest = sample
+            self.frames_inferred += 1
+    
+    def set_inference_interval(self, every):
+        # Run hand inference on every Nth captured frame (motion model only)
+        self.schedule.set_every(every)
+        return self.schedule.every
+    
+    def _capture_loop(self):
+        fps = getattr(self.cap, 'fps', None)
+        interval = 1.0 / fps if self.pace and fps else 0
+        next_read = time.perf_counter()
+        while self.running:
+            if interval:
+                delay = next_read - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_read = max(next_read + interval, time.perf_counter() - interval)
+            item = self._read_frame()
+            if item is None:
+                time.sleep(0.005)
+                continue
+            self.buffer.put(item)
+
+    def _inference_loop(self):
+        while self.running:
+            item = self.buffer.get(timeout=0.1)
+            if item is not None:
+                self._track(item)
+
+    def latest_sample(self):
+        # Never blocks in threaded mode: returns the freshest sample (None before
+        # the first one) and whether the render loop is seeing it for the first time
+        if not self.threaded:
+            item = self._read_frame()
+            if item is not None:
+                self._track(item)
+        with self.lock:
+            sample = self.latest
+            now = self.now()
+            estimates = [model.estimate(now) for model in self.filters] if sample is not None else []
+        if sample is None:
+            return None, False
+        is_new = sample.sequence != self.last_consumed
+        if is_new:
+            self.last_consumed = sample.sequence
+            self.latency_ms = (self.now() - sample.capture_time) * 1000
+            self.avg_latency_ms += (self.latency_ms - self.avg_latency_ms) * self.latency_smoothing
+        if self.motion_model is None:
+            return sample, is_new
+        
+        # Every render tick gets its own positions, so the blades see them as new.
+        # A slot with no track (or a stale one) reports its hand as lost.
+        hands = []
+        uncertainties = []
+        for estimate in estimates:
+            if estimate is None:
+                hands.append(NO_HAND)
+                uncertainties.append(None)
+            else:
+                x, y, vx, vy, sigma = estimate
+                speed, vel_vector = frame_velocity(vx, vy)
+                hands.append((x, y, speed, vel_vector))
+                uncertainties.append(sigma)
+        self.uncertainty = uncertainties[0]
+        tracking = any(estimate is not None for estimate in estimates)
+        return HandSample(sample.sequence, sample.frame, hands, sample.capture_time,
+                          sample.inference_time, uncertainties), is_new or tracking
+    
+    def stats(self):
+        return {
+            'queue_depth': self.buffer.depth(),
+            'dropped_frames': self.buffer.dropped,
+            'frames_captured': self.frames_captured,
+            'frames_inferred': self.frames_inferred,
+            'read_failures': self.read_failures,
+            'latency_ms': self.latency_ms,
+            'avg_latency_ms': self.avg_latency_ms,
+            'inferences_skipped': self.schedule.skipped,
+            'uncertainty': self.uncertainty
+        }
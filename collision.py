@@ -0,0 +1,128 @@
+import math
+import numpy as np
+
+def point_segment_distance(points, a, b):
+    # Distances from N points to S segments a->b, as an (S, N) array, plus the
+    # clamped position t along each segment of the closest point
+    ab = b - a
+    ap = points[None, :, :] - a[:, None, :]
+    length_sq = np.maximum((ab * ab).sum(axis=1), 1e-9)
+    t = np.clip((ap * ab[:, None, :]).sum(axis=2) / length_sq[:, None], 0.0, 1.0)
+    offset = ap - t[:, :, None] * ab[:, None, :]
+    return np.sqrt((offset * offset).sum(axis=2)), t
+
+def _cross(o, p, q):
+    return (p[..., 0] - o[..., 0]) * (q[..., 1] - o[..., 1]) - (p[..., 1] - o[..., 1]) * (q[..., 0] - o[..., 0])
+
+def segment_segment_distance(a, b, c, d):
+    # Distances between S blade segments a->b and N fruit paths c->d, (S, N),
+    # plus where along each blade segment the path's end point is closest.
+    # In 2D the closest approach of two disjoint segments is always at an
+    # endpoint, so four point-segment distances plus a crossing test are exact.
+    dist_c, _ = point_segment_distance(c, a, b)
+    dist_d, t = point_segment_distance(d, a, b)
+    dist_a, _ = point_segment_distance(a, c, d)
+    dist_b, _ = point_segment_distance(b, c, d)
+    dist = np.minimum(np.minimum(dist_c, dist_d), np.minimum(dist_a.T, dist_b.T))
+
+    A, B = a[:, None, :], b[:, None, :]
+    C, D = c[None, :, :], d[None, :, :]
+    crosses = ((_cross(A, B, C) * _cross(A, B, D)) < 0) & ((_cross(C, D, A) * _cross(C, D, B)) < 0)
+    dist[crosses] = 0.0
+    return dist, t
+
+class UniformGrid:
+    # Broad-phase buckets keyed by integer cell. Each fruit is listed under
+    # every cell its swept bounding box overlaps; entries are kept sorted by
+    # cell key so building and querying are array operations.
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.keys = np.empty(0, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _key(cx, cy):
+        return cx * 1000003 + cy
+
+    def build(self, mins, maxs):
+        lo = np.floor(mins / self.cell_size).astype(np.int64)
+        hi = np.floor(maxs / self.cell_size).astype(np.int64)
+        span = int((hi - lo).max()) + 1 if len(lo) else 1
+
+        # Every (dx, dy) cell offset up to the widest box, masked per fruit
+        dx, dy = np.meshgrid(np.arange(span), np.arange(span), indexing='ij')
+        dx, dy = dx.ravel(), dy.ravel()
+        cx = lo[:, 0:1] + dx
+        cy = lo[:, 1:2] + dy
+        inside = (cx <= hi[:, 0:1]) & (cy <= hi[:, 1:2])
+        fruit = np.broadcast_to(np.arange(len(lo))[:, None], cx.shape)
+
+        keys = self._key(cx[inside], cy[inside])
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.indices = fruit[inside][order]
+
+    def query(self, x0, y0, x1, y1):
+        size = self.cell_size
+        cx, cy = np.meshgrid(np.arange(math.floor(x0 / size), math.floor(x1 / size) + 1),
+                             np.arange(math.floor(y0 / size), math.floor(y1 / size) + 1))
+        keys = self._key(cx.ravel(), cy.ravel())
+        starts = np.searchsorted(self.keys, keys, side='left')
+        ends = np.searchsorted(self.keys, keys, side='right')
+        if not (ends > starts).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.indices[a:b] for a, b in zip(starts.tolist(), ends.tolist()) if b > a])
+
+class CollisionSystem:
+    def __init__(self, cell_size=128, min_blade_speed=15, grid_threshold=128):
+        self.grid = UniformGrid(cell_size)
+        self.min_blade_speed = min_blade_speed  # Shortest segment that counts as a slice
+        self.grid_threshold = grid_threshold  # Below this many fruits brute force is cheaper
+        self.candidates_tested = 0
+
+    def find_hits(self, segments, centers, prev_centers, radius):
+        # segments: list of ((x1, y1), (x2, y2)) blade moves since the last check
+        # centers/prev_centers: (N, 2) fruit positions now and one frame ago
+        # Returns [(fruit_index, segment_index)] in blade order, each fruit at most once
+        if not segments or len(centers) == 0:
+            return []
+        seg = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        lengths = np.hypot(seg[:, 2] - seg[:, 0], seg[:, 3] - seg[:, 1])
+        valid = np.flatnonzero(lengths >= self.min_blade_speed)
+        if len(valid) == 0:
+            return []
+        seg = seg[valid]
+        a, b = seg[:, :2], seg[:, 2:]
+        centers = np.asarray(centers, dtype=np.float64)
+        prev_centers = np.asarray(prev_centers, dtype=np.float64)
+
+        # Broad phase: only fruits sharing a grid cell with some blade segment
+        if len(centers) >= self.grid_threshold:
+            mins = np.minimum(centers, prev_centers) - radius
+            maxs = np.maximum(centers, prev_centers) + radius
+            self.grid.build(mins, maxs)
+            found = [self.grid.query(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+                     for x0, y0, x1, y1 in seg.tolist()]
+            candidates = np.unique(np.concatenate(found))
+            if len(candidates) == 0:
+                return []
+        else:
+            candidates = np.arange(len(centers))
+        self.candidates_tested += len(candidates)
+
+        # Narrow phase: swept test of each blade segment against each fruit's path
+        dist, t = segment_segment_distance(a, b, prev_centers[candidates], centers[candidates])
+        hit_seg, hit_fruit = np.nonzero(dist < radius)
+        if len(hit_seg) == 0:
+            return []
+
+        # Deterministic order: along the blade, then by fruit index
+        order = np.lexsort((candidates[hit_fruit], t[hit_seg, hit_fruit], hit_seg))
+        hits = []
+        seen = set()
+        for k in order.tolist():
+            fruit_index = int(candidates[hit_fruit[k]])
+            if fruit_index not in seen:
+                seen.add(fruit_index)
+                hits.append((fruit_index, int(valid[hit_seg[k]])))
+        return hits
@@ -0,0 +1,53 @@
+import pygame
+
+class DirtyRectRenderer:
+    # Repaints only what changed: areas drawn last frame are restored from the
+    # cached background, and only last frame's plus this frame's rectangles
+    # are pushed to the display
+    def __init__(self, screen, background, fill_color=(20, 20, 50)):
+        self.fill_color = fill_color
+        self.previous = []
+        self.current = []
+        self.set_target(screen, background)
+
+    def set_target(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.screen_rect = screen.get_rect()
+        self.full_redraw = True
+
+    def begin_frame(self):
+        if self.full_redraw:
+            self._restore(self.screen_rect)
+        else:
+            for rect in self.previous:
+                self._restore(rect)
+
+    def _restore(self, rect):
+        if self.background is not None:
+            self.screen.blit(self.background, rect, rect)
+        else:
+            self.screen.fill(self.fill_color, rect)
+
+    def add(self, rects):
+        # Accepts a Rect, a list of Rects or None from the draw calls
+        if rects is None:
+            return
+        if isinstance(rects, pygame.Rect):
+            rects = (rects,)
+        for rect in rects:
+            if rect is None:  # Culled by the render queue
+                continue
+            rect = rect.clip(self.screen_rect)
+            if rect.width and rect.height:
+                self.current.append(rect)
+
+    def end_frame(self, present=True):
+        if present:
+            if self.full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.previous + self.current)
+        self.full_redraw = False
+        self.previous = self.current
+        self.current = []
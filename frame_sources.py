@@ -0,0 +1,192 @@
+import cv2
+import os
+import math
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class FrameSource:
+    # Sources that know the hand position themselves bypass HandTracker
+    provides_hand_position = False
+
+    def __init__(self):
+        self.hands = 1  # Hands reported by hand_positions()
+        self.index = 0
+        self.frame_count = None  # None for unbounded sources
+        self.fps = 30  # Playback rate when paced in real time, None if self-paced
+
+    def read(self):
+        raise NotImplementedError
+
+    def seek(self, index):
+        return False
+
+    def tell(self):
+        return self.index
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+class CameraSource(FrameSource):
+    def __init__(self, device=0, width=640, height=480):
+        super().__init__()
+        self.fps = None  # The device blocks until the next frame is ready
+        self.cap = cv2.VideoCapture(device)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.index += 1
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, loop=True):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file: {path}")
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.index > 0:
+            self.seek(0)
+            ret, frame = self.cap.read()
+        if ret:
+            self.index += 1
+        return ret, frame
+
+    def seek(self, index):
+        if self.frame_count:
+            index = index % self.frame_count
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self.index = index
+        return True
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+class ImageSequenceSource(FrameSource):
+    def __init__(self, directory, loop=True):
+        super().__init__()
+        self.loop = loop
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise IOError(f"No frames found in: {directory}")
+        self.frame_count = len(self.paths)
+
+    def read(self):
+        if self.index >= self.frame_count:
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        if frame is None:
+            return False, None
+        self.index += 1
+        return True, frame
+
+    def seek(self, index):
+        self.index = index % self.frame_count
+        return True
+
+class SyntheticHandSource(FrameSource):
+    provides_hand_position = True
+
+    def __init__(self, trajectory='figure8', points=None, period=120, size=(640, 480), hands=1):
+        super().__init__()
+        self.hands = hands  # Extra hands run the same path, evenly phase-shifted
+        self.trajectory = trajectory
+        self.points = points  # Optional scripted (x, y) keyframes, looped
+        self.period = period  # Frames per loop of the trajectory
+        self.frame_count = len(points) if points else period
+        self.blank = np.full((size[1], size[0], 3), 30, dtype=np.uint8)
+
+    def position_at(self, index):
+        if self.points:
+            return self.points[index % len(self.points)]
+
+        t = 2 * math.pi * (index % self.period) / self.period
+        if self.trajectory == 'circle':
+            return 0.5 + 0.3 * math.cos(t), 0.5 + 0.3 * math.sin(t)
+        if self.trajectory == 'swipe':
+            # Fast horizontal strokes that sweep down and back up the screen
+            phase = (index % self.period) / self.period
+            x = 0.15 + 0.7 * abs(((index % 30) / 15.0) - 1)
+            y = 0.25 + 0.5 * abs(phase * 2 - 1)
+            return x, y
+        # Default figure-eight covers most of the play area
+        return 0.5 + 0.35 * math.sin(t), 0.5 + 0.25 * math.sin(2 * t)
+
+    def hand_position(self, hand=0):
+        # Same (x, y, speed, velocity) shape as HandTracker.get_hand_position
+        index = max(self.index - 1, 0)
+        x, y = self.hand_at(index, hand)
+        if index == 0:
+            return x, y, 0, (0, 0)
+        prev_x, prev_y = self.hand_at(index - 1, hand)
+        velocity = ((x - prev_x) * 1.5, (y - prev_y) * 1.5)
+        speed = math.sqrt(velocity[0]**2 + velocity[1]**2) * 1000
+        return x, y, speed, velocity
+
+    def hand_at(self, index, hand):
+        return self.position_at(index + hand * self.period // max(self.hands, 1))
+
+    def hand_positions(self):
+        # Same shape as HandTracker.get_hands
+        return [self.hand_position(hand) for hand in range(self.hands)]
+
+    def read(self):
+        self.index += 1
+        return True, self.blank.copy()
+
+    def seek(self, index):
+        self.index = index
+        return True
+
+def is_synthetic_spec(spec):
+    # "synthetic" or "synthetic:<trajectory>", not just any path starting with it
+    return spec == 'synthetic' or spec.startswith('synthetic:')
+
+def is_scripted(spec):
+    # Whether open_frame_source(spec) reports hand positions itself (no tracker needed)
+    if isinstance(spec, FrameSource):
+        return spec.provides_hand_position
+    return spec is not None and is_synthetic_spec(spec)
+
+def open_frame_source(spec=None, hands=1):
+    # Accepts "camera", "camera:<n>", "synthetic", "synthetic:<trajectory>",
+    # a directory of frames or a video file path. `hands` is how many hands a
+    # synthetic source scripts.
+    if spec is None or spec == 'camera':
+        return CameraSource(0)
+    if isinstance(spec, FrameSource):
+        return spec
+    if spec.startswith('camera:'):
+        return CameraSource(int(spec.split(':', 1)[1]))
+    if is_synthetic_spec(spec):
+        trajectory = spec.split(':', 1)[1] if ':' in spec else 'figure8'
+        return SyntheticHandSource(trajectory, hands=hands)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec)
+    return VideoFileSource(spec)
@@ -1,79 +1,331 @@
-import pygame
-import cv2
-import math
 import os
+import sys
+import time
+import math
+import random
+import argparse
+
+# Startup phases are timed from here
+STARTUP_ORIGIN = time.perf_counter()
+
+# Headless runs need SDL's dummy drivers picked before pygame initializes
+if '--headless' in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
 import numpy as np
-from hand_tracking import HandTracker
-from game_objects import Fruit, BladeTrail
+from hand_tracking import HandTracker, BLADE_ANCHORS
+from capture_pipeline import CapturePipeline, NO_HAND
+from frame_sources import open_frame_source, is_scripted
+from game_clock import FixedStepClock, LatchedClock, ReplayClock, WallClock, wall_clock
+from asset_cache import assets
+from particles import particle_pool
+from sprite_cache import rotations
+from dirty_rects import DirtyRectRenderer
+from render_queue import RenderQueue, LAYER_PREVIEW, LAYER_UI
+from profiler import FrameProfiler
+from collision import CollisionSystem
+from text_cache import text_cache, PulseText
+from camera_preview import CameraPreview
+from motion_model import HandKalmanFilter
+from process_tracker import ProcessTracker
+from session_log import SessionRecorder, SessionLog, state_hash, FLAG_FULLSCREEN
+from game_objects import Fruit, BladeTrail, spawn_random
+from fruit_world import FruitWorld
 from game_engine import GameEngine
+from startup import StartupLoader, draw_loading_screen
+from audio import pre_init_mixer, init_mixer, MIXER_BUFFER
+from quality import QualityGovernor, QUALITY_TIERS, tier_index, capped_rate
 
-# Initialize Pygame
-pygame.init()
+IMPORTS_DONE = time.perf_counter()
 
-# Get display info
-display_info = pygame.display.Info()
-SCREEN_WIDTH = display_info.current_w
-SCREEN_HEIGHT = display_info.current_h
+def init_pygame():
+    # Pygame with the low-latency mixer buffer; returns the monitor size. Not
+    # done on import: hand tracker worker processes re-import this module and
+    # must not open a mixer and a display of their own.
+    if not pygame.get_init():
+        pre_init_mixer()
+        pygame.init()
+    display_info = pygame.display.Info()
+    return display_info.current_w, display_info.current_h
 
 # Game constants
 WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
 FPS = 60
+PROCESS_READY_TIMEOUT = 30.0  # Seconds a headless run waits for a tracker process to load MediaPipe
 
 # Colors
 UI_BLUE = (100, 200, 255)
 UI_GOLD = (255, 215, 0)
 UI_WHITE = (255, 255, 255)
 
+# Per-player accent and blade trail colors (None keeps the classic blue trail)
+PLAYER_COLORS = [UI_BLUE, (255, 150, 60), (120, 230, 120), (210, 130, 255)]
+PLAYER_BLADE_COLORS = [
+    None,
+    [(255, 170, 90, 200), (255, 120, 40, 150), (230, 70, 0, 100)],
+    [(150, 255, 150, 200), (80, 220, 80, 150), (0, 170, 0, 100)],
+    [(220, 160, 255, 200), (180, 100, 255, 150), (130, 40, 230, 100)]
+]
+
+# UI font
+UI_FONT = 'fonts/ninja.ttf'
+
+# Named internal render resolutions for --render-size (anything else is WxH)
+RENDER_PRESETS = {
+    'xga': (1024, 768),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080)
+}
+
+def parse_render_size(text):
+    if text in RENDER_PRESETS:
+        return RENDER_PRESETS[text]
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+# Score glow offsets, drawn up to the quality tier's glow_passes
+GLOW_OFFSETS = [(2, 2), (-2, -2), (2, -2), (-2, 2)]
+
 # Camera preview settings
 PREVIEW_SIZE = (320, 240)
 PREVIEW_PADDING = 20
+# Opacity of the hand-to-cursor line: the three fading passes (alpha 150, 110
+# and 70) it used to be blitted with, combined into one
+PREVIEW_LINE_ALPHA = round(255 * (1 - (1 - 150 / 255) * (1 - 110 / 255) * (1 - 70 / 255)))
 
 class FruitNinja:
-    def __init__(self):
+    def __init__(self, source=None, headless=False, clock=None, dirty_rects=False,
+                 profile=False, trace_path=None, max_fruits=8, min_fruits=3, preview_fps=30,
+                 inference_budget_ms=None, motion_model=False, infer_every=1, infer_hz=None,
+                 players=1, record_path=None, replay_path=None, seed=None, audio_buffer=MIXER_BUFFER,
+                 render_size=None, quality='auto', inference_process=False, anchor='palm',
+                 roi_tracking=False):
+        init_start = time.perf_counter()
+        if players < 1:
+            raise ValueError(f"players must be at least 1, got {players}")
+        self.monitor_size = init_pygame()  # Before set_mode, which changes what Info() reports
+        
         # Create required directories
         for dir_name in ['fruits', 'cursor', 'sounds', 'fonts', 'background']:
             os.makedirs(dir_name, exist_ok=True)
         
-        # Initialize display
+        # A replay brings its own players, seed, fruit limits, playfield size and per-frame clock
+        self.replay = SessionLog(replay_path) if replay_path else None
+        if self.replay is not None:
+            players = self.replay.players
+            seed = self.replay.seed
+            min_fruits, max_fruits = self.replay.min_fruits, self.replay.max_fruits
+            render_size = self.replay.render_size
+            self.monitor_size = self.replay.monitor_size
+            clock = ReplayClock(self.replay.records['ticks'])
+        
+        # Initialize display. With a render size the game draws into an offscreen
+        # surface of that size, scaled to the window (or monitor) once per frame,
+        # so what a frame costs doesn't depend on the display resolution.
         self.is_fullscreen = False
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.render_size = render_size
+        self.display = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Fruit Ninja Ultimate Enhanced")
+        if render_size is not None:
+            self.screen = pygame.Surface(render_size).convert()
+            self.fit_to_display()
+        else:
+            self.screen = self.display
         self.clock = pygame.time.Clock()
         
+        # Headless runs step a simulated clock instead of following the wall clock
+        self.headless = headless
+        if clock is None:
+            clock = FixedStepClock(FPS) if headless else wall_clock
+        if record_path and isinstance(clock, WallClock):
+            # One clock reading per frame, so the log holds the exact ticks the game saw
+            clock = LatchedClock(clock)
+        self.game_clock = clock
+        
+        # Fruit spawns (and particle sprays) follow the session seed
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        spawn_random.seed(self.seed)
+        particle_pool.seed(self.seed)
+        
         # Calculate scaling factors for different resolutions
         self.update_screen_scaling()
         
+        # Everything slow runs on worker threads behind a loading screen: image and
+        # sound decoding straight away, cameras and hand trackers (MediaPipe) as
+        # soon as they're up. The game starts once the assets are in; the cameras
+        # join in whenever they're ready.
+        self.startup = StartupLoader(STARTUP_ORIGIN)
+        self.startup.record('imports', 0.0, (IMPORTS_DONE - STARTUP_ORIGIN) * 1000)
+        self.startup.record('display', (init_start - STARTUP_ORIGIN) * 1000)
+        init_mixer(audio_buffer)
+        self.asset_tasks = ['fruit images', 'engine assets']
+        self.startup.submit('fruit images', Fruit.prewarm)
+        self.startup.submit('engine assets', GameEngine.preload, self.screen_width, self.screen_height)
+        
+        # Initialize frame sources (live camera unless told otherwise, scripted hands when headless).
+        # Several sources means one camera per player group; players are split evenly across them.
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        if sources == [None] and headless:
+            sources = ['synthetic']
+        if self.replay is not None:
+            sources = []  # Hands come from the log, no camera or MediaPipe
+        hands_per_camera = -(-players // max(len(sources), 1))
+        
+        # Open every camera and load its tracker in the background. Scripted sources
+        # report the hand positions themselves, no MediaPipe needed. With several
+        # cameras (or with inference_process) each one gets its own inference process and core.
+        self.input_tasks = []  # (camera task, tracker task or None) per camera
+        self.player_slots = []  # (pipeline index, hand slot) of every player
+        for camera, spec in enumerate(sources):
+            camera_task = f'camera {camera}'
+            self.startup.submit(camera_task, open_frame_source, spec, hands_per_camera)
+            tracker_task = None
+            if not is_scripted(spec):
+                tracker_task = f'tracker {camera}'
+                tracker_class = ProcessTracker if len(sources) > 1 or inference_process else HandTracker
+                self.startup.submit(tracker_task, tracker_class,
+                                    inference_budget_ms=inference_budget_ms, max_hands=hands_per_camera,
+                                    anchor=anchor, roi_tracking=roi_tracking)
+            self.input_tasks.append((camera_task, tracker_task))
+            for slot in range(hands_per_camera):
+                if len(self.player_slots) < players:
+                    self.player_slots.append((camera, slot))
+        self.input_names = [name for task in self.input_tasks for name in task if name is not None]
+        
+        # Skipping inference needs the motion model to fill in the frames in between
+        # (headless runs process one frame per tick on the loop itself so they stay deterministic)
+        self.pipeline_options = {
+            'threaded': not headless,
+            'motion_model': HandKalmanFilter if motion_model or infer_every > 1 or infer_hz else None,
+            'infer_every': infer_every,
+            'infer_hz': infer_hz,
+            'clock': self.game_clock
+        }
+        self.caps = []
+        self.trackers = []
+        self.pipelines = []
+        self.cap = self.hand_tracker = self.pipeline = None
+        
+        # The loading screen stays up until fruits and engine assets are decoded
+        self.startup.wait(self.asset_tasks, None if headless else self.show_loading_screen)
+        
         # Initialize game components
-        self.engine = GameEngine(self.screen_width, self.screen_height)
-        self.hand_tracker = HandTracker()
-        self.blade_trail = BladeTrail(self.screen_width, self.screen_height)
+        # (one blade, katana, combo and score per player)
+        self.engine = GameEngine(self.screen_width, self.screen_height, self.game_clock, players)
+        self.blades = [BladeTrail(self.screen_width, self.screen_height, self.game_clock,
+                                  PLAYER_BLADE_COLORS[i % len(PLAYER_BLADE_COLORS)])
+                       for i in range(players)]
+        self.blade_trail = self.blades[0]
+        
+        # Juice particles from every fruit live in one shared pool
+        self.particles = particle_pool
+        self.particles.clear()
         
         # Initialize fruits
-        self.fruits = [Fruit(self.screen_width, self.screen_height) for _ in range(5)]
+        # (every fruit's state lives in one set of arrays, sized here and never grown)
+        self.max_fruits = max_fruits
+        self.min_active_fruits = min_fruits
+        # One refill per frame in a normal game; stress runs with thousands of
+        # fruits fill up in about eight frames
+        self.spawns_per_frame = max(1, min_fruits // 8)
+        self.fruits = FruitWorld(self.max_fruits, self.screen_width, self.screen_height, step_ms=1000 / FPS)
+        self.fruits.spawn(self.game_clock.get_ticks(), min(5, self.max_fruits))
+        self.collisions = CollisionSystem()
         
-        # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        # Session recording (one fixed-size record per frame) and the blank
+        # camera frame a replay's preview is drawn on
+        self.recorder = (SessionRecorder(record_path, players, self.seed, FPS, min_fruits, max_fruits,
+                                         render_size, self.monitor_size) if record_path else None)
+        self.replay_frame = np.zeros((480, 640, 3), dtype=np.uint8)
         
         # Create static surfaces
         self.preview_bg = pygame.Surface((PREVIEW_SIZE[0] + 4, PREVIEW_SIZE[1] + 4))
         self.preview_bg.fill(UI_WHITE)
+        self.preview_fps = preview_fps  # The user's rate; quality tiers only cap it
+        self.preview = CameraPreview(PREVIEW_SIZE, preview_fps)
         
         # UI Elements
-        try:
-            self.font = pygame.font.Font('fonts/ninja.ttf', 36)
-            self.small_font = pygame.font.Font('fonts/ninja.ttf', 24)
-        except:
-            self.font = pygame.font.Font(None, 36)
-            self.small_font = pygame.font.Font(None, 24)
+        # (score and glow text come from the glyph cache, combo frames are pre-scaled)
+        # (one pulse per player, or players would keep rebuilding each other's frames)
+        self.combo_pulses = [PulseText(text_cache, UI_FONT, 24, UI_GOLD) for _ in self.engine.players]
+        
+        # Everything but the background goes through the render queue, flushed once a frame
+        self.queue = RenderQueue(self.screen)
+        
+        # Optional dirty-rectangle renderer: only redraw and present what changed
+        self.renderer = DirtyRectRenderer(self.screen, self.engine.background) if dirty_rects else None
+        
+        # Per-stage frame profiler (F3 toggles the overlay)
+        self.trace_path = trace_path
+        self.profiler = FrameProfiler(enabled=profile or trace_path is not None,
+                                      trace=trace_path is not None)
+        self.profiler.show_overlay = profile and not headless
+        
+        # Visual quality: a fixed tier, or 'auto' to let the governor trade effects for
+        # frame time (headless runs have no frame budget and stay on the top tier)
+        self.governor = QualityGovernor(FPS) if quality == 'auto' and not headless else None
+        self.quality_tier = tier_index('high' if quality == 'auto' else quality)
+        self.apply_quality()
+        
+        # Headless runs wait for their inputs (and for tracker processes to load
+        # MediaPipe) so every run starts on the same frame
+        if headless:
+            self.startup.wait(self.input_names)
+            self.attach_inputs()
+            for tracker in self.trackers:
+                if isinstance(tracker, ProcessTracker):
+                    tracker.wait_ready(PROCESS_READY_TIMEOUT)
+        self.startup.record('init', (init_start - STARTUP_ORIGIN) * 1000)
+    
+    def apply_quality(self):
+        # Hands the current tier's settings to the subsystems that own them
+        if self.governor is not None:
+            self.quality_tier = self.governor.tier
+        settings = QUALITY_TIERS[self.quality_tier]
+        Fruit.particles_per_slice = settings['particles']
+        for blade in self.blades:
+            blade.layers = settings['trail_layers']
+        self.engine.katana_ghosts = settings['katana_ghosts']
+        self.glow_passes = settings['glow_passes']
+        self.preview.set_fps(capped_rate(self.preview_fps, settings['preview_fps']))
+        for tracker in self.trackers:
+            # (trackers in their own process keep their resolution)
+            if isinstance(tracker, HandTracker):
+                tracker.max_level = settings['max_inference_level']
+    
+    def show_loading_screen(self):
+        draw_loading_screen(self.screen, self.startup, self.asset_tasks + self.input_names)
+        pygame.event.pump()
+        self.present()
+    
+    def attach_inputs(self):
+        # Builds a capture pipeline per camera once the camera and tracker tasks are done
+        for camera_task, tracker_task in self.input_tasks:
+            cap = self.startup.result(camera_task)
+            tracker = self.startup.result(tracker_task) if tracker_task is not None else None
+            self.caps.append(cap)
+            self.trackers.append(tracker)
+            self.pipelines.append(CapturePipeline(cap, tracker, **self.pipeline_options))
+        self.cap = self.caps[0] if self.caps else None
+        self.hand_tracker = self.trackers[0] if self.trackers else None
+        self.pipeline = self.pipelines[0] if self.pipelines else None
+        self.apply_quality()  # The new trackers get the tier's inference size
     
     def update_screen_scaling(self):
         # Get current screen dimensions
-        if self.is_fullscreen:
-            self.screen_width = SCREEN_WIDTH
-            self.screen_height = SCREEN_HEIGHT
+        if self.render_size is not None:
+            self.screen_width, self.screen_height = self.render_size
+        elif self.is_fullscreen:
+            self.screen_width, self.screen_height = self.monitor_size
         else:
             self.screen_width = WINDOW_WIDTH
             self.screen_height = WINDOW_HEIGHT
@@ -85,10 +337,52 @@ class FruitNinja:
     def toggle_fullscreen(self):
         self.is_fullscreen = not self.is_fullscreen
         if self.is_fullscreen:
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
+            self.display = pygame.display.set_mode(self.monitor_size, pygame.FULLSCREEN)
         else:
-            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            self.display = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        
+        # A fixed render size only changes where the frame is scaled to
+        if self.render_size is not None:
+            self.fit_to_display()
+            return
+        
+        old_size = (self.screen_width, self.screen_height)
+        self.screen = self.display
+        self.queue.set_target(self.screen)
         self.update_screen_scaling()
+        self.relayout(old_size)
+    
+    def relayout(self, old_size):
+        # Everything sized for the old screen follows it to the new one
+        size = (self.screen_width, self.screen_height)
+        assets.evict_size(old_size)
+        rotations.clear()
+        self.engine.resize(*size)
+        for blade in self.blades:
+            blade.resize(*size)
+        self.fruits.resize(*size, self.game_clock.get_ticks())
+        if self.renderer is not None:
+            self.renderer.set_target(self.screen, self.engine.background)
+    
+    def fit_to_display(self):
+        # Largest area of the display with the render size's aspect ratio, centered
+        display_width, display_height = self.display.get_size()
+        render_width, render_height = self.render_size
+        scale = min(display_width / render_width, display_height / render_height)
+        area = pygame.Rect(0, 0, int(render_width * scale), int(render_height * scale))
+        area.center = (display_width // 2, display_height // 2)
+        self.display.fill((0, 0, 0))
+        self.display_area = self.display.subsurface(area)
+    
+    def present(self):
+        # One scale of the finished frame to the display, then the flip
+        if self.render_size is not None:
+            pygame.transform.scale(self.screen, self.display_area.get_size(), self.display_area)
+        pygame.display.flip()
+    
+    def mark_dirty(self, rects):
+        if self.renderer is not None:
+            self.renderer.add(rects)
     
     def scale_position(self, x, y):
         # Scale position from camera space (0-1) to screen space with proper range
@@ -105,13 +399,9 @@ class FruitNinja:
     
     def frame_to_surface(self, frame):
         try:
-            # Resize frame for preview
-            frame = cv2.resize(frame, PREVIEW_SIZE)
-            # Convert from BGR to RGB and rotate correctly
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Create pygame surface
-            surface = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
-            return surface
+            # Resize, convert and write into the persistent preview surface
+            self.preview.update(frame)
+            return self.preview.surface
         except Exception as e:
             print(f"Error converting frame: {e}")
             # Return black surface if conversion fails
@@ -119,23 +409,22 @@ class FruitNinja:
             surface.fill((0, 0, 0))
             return surface
     
-    def draw_camera_preview(self, frame, hand_pos, velocity):
+    def draw_camera_preview(self, frame, hand_pos, velocity, refresh=True, other_hands=()):
         try:
-            # Draw tracking visualization
-            preview_frame = self.hand_tracker.draw_tracking_info(frame.copy(), hand_pos, velocity)
-            
-            # Convert frame to pygame surface
-            preview_surface = self.frame_to_surface(preview_frame)
+            # Refresh the preview (at most preview_fps times a second) with tracking visualization
+            if refresh:
+                self.preview.update(frame, hand_pos, velocity, self.game_clock.get_ticks(), other_hands)
+            preview_surface = self.preview.surface
             
             # Calculate preview position (bottom-right corner)
             preview_x = self.screen_width - PREVIEW_SIZE[0] - PREVIEW_PADDING
             preview_y = self.screen_height - PREVIEW_SIZE[1] - PREVIEW_PADDING
             
             # Draw background for preview
-            self.screen.blit(self.preview_bg, (preview_x - 2, preview_y - 2))
+            self.mark_dirty(self.queue.submit(LAYER_PREVIEW, self.preview_bg, (preview_x - 2, preview_y - 2)))
             
             # Draw preview
-            self.screen.blit(preview_surface, (preview_x, preview_y))
+            self.queue.submit(LAYER_PREVIEW + 1, preview_surface, (preview_x, preview_y))
             
             # Draw connection line between hand and cursor if hand is detected
             if hand_pos[0] is not None and hand_pos[1] is not None:
@@ -143,92 +432,130 @@ class FruitNinja:
                 preview_hand_x = preview_x + int(hand_pos[0] * PREVIEW_SIZE[0])
                 preview_hand_y = preview_y + int(hand_pos[1] * PREVIEW_SIZE[1])
                 
-                # Draw connecting line with fade effect
-                for i in range(3):
-                    alpha = 150 - i * 40
-                    color = (*UI_BLUE[:3], alpha)
-                    line_surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-                    pygame.draw.line(line_surface, color, 
-                                  (preview_hand_x, preview_hand_y),
-                                  (game_x, game_y), 2)
-                    self.screen.blit(line_surface, (0, 0))
+                # Draw connecting line, on a surface just big enough for it
+                left = min(preview_hand_x, game_x) - 2
+                top = min(preview_hand_y, game_y) - 2
+                line_rect = pygame.Rect(left, top,
+                                        abs(game_x - preview_hand_x) + 4,
+                                        abs(game_y - preview_hand_y) + 4)
+                line_surface = pygame.Surface(line_rect.size, pygame.SRCALPHA)
+                pygame.draw.line(line_surface, (*UI_BLUE[:3], PREVIEW_LINE_ALPHA),
+                                 (preview_hand_x - left, preview_hand_y - top),
+                                 (game_x - left, game_y - top), 2)
+                self.mark_dirty(self.queue.submit(LAYER_PREVIEW + 2, line_surface, line_rect))
         
         except Exception as e:
             print(f"Error drawing preview: {e}")
     
+    def draw_startup_status(self):
+        # Stands in for the camera preview until the cameras are up
+        status = text_cache.text(UI_FONT, 24, UI_WHITE, "Starting camera...")
+        x = self.screen_width - PREVIEW_SIZE[0] - PREVIEW_PADDING
+        y = self.screen_height - PREVIEW_PADDING - status.get_height()
+        self.mark_dirty(self.queue.submit(LAYER_UI, status, (x, y)))
+    
     def update_fruits(self):
-        active_fruits = sum(1 for fruit in self.fruits if not fruit.sliced)
-        if active_fruits < 3:
-            self.fruits.append(Fruit(self.screen_width, self.screen_height))
-            if len(self.fruits) > 8:
-                self.fruits.pop(0)
+        now = self.game_clock.get_ticks()
+        self.fruits.release_finished(now)
+        missing = self.min_active_fruits - len(self.fruits.active())
+        if missing > 0:
+            self.fruits.spawn(now, min(missing, self.spawns_per_frame))
     
-    def check_collisions(self, blade_points):
-        if len(blade_points) < 2:
+    def check_collisions(self, player_segments):
+        # Every blade segment added since the last check, tested against each
+        # fruit's motion over the last frame so fast swipes can't tunnel through.
+        # player_segments holds one list per player; a fruit hit by several blades
+        # in the same frame goes to the fastest one, the lower player on a tie.
+        if not any(player_segments):
             return
         
-        # Get latest blade movement
-        p1 = blade_points[-2]
-        p2 = blade_points[-1]
-        
-        # Calculate blade velocity and angle
-        dx = p2[0] - p1[0]
-        dy = p2[1] - p1[1]
-        blade_velocity = math.sqrt(dx*dx + dy*dy)
-        slice_angle = math.degrees(math.atan2(dy, dx))
-        
-        if blade_velocity < 15:  # Minimum velocity for valid slice
+        fruits = self.fruits
+        active = fruits.active()
+        if not len(active):
             return
+        centers = np.column_stack((fruits.x[active], fruits.y[active]))
+        prev_centers = np.column_stack((fruits.prev_x[active], fruits.prev_y[active]))
+        fruit_radius = 35 * min(self.scale_x, self.scale_y)  # Scale hitbox with screen size
         
-        # Check collision with each fruit
-        for fruit in self.fruits:
-            if not fruit.sliced:
-                # Calculate distance from fruit to blade line segment
-                fruit_radius = 35 * min(self.scale_x, self.scale_y)  # Scale hitbox with screen size
-                dist = abs(dy*fruit.x - dx*fruit.y + p2[0]*p1[1] - p2[1]*p1[0]) / blade_velocity
-                
-                if dist < fruit_radius:
-                    fruit.sliced = True
-                    fruit.slice_time = pygame.time.get_ticks()
-                    fruit.slice_direction = slice_angle
-                    fruit.create_particles(slice_angle)
-                    self.engine.play_slice_sound()
-                    self.engine.score += 10 * (self.engine.combo + 1)
-                    self.engine.update_combo(pygame.time.get_ticks())
+        claims = {}
+        for player, segments in zip(self.engine.players, player_segments):
+            if not segments:
+                continue
+            hits = self.collisions.find_hits(segments, centers, prev_centers, fruit_radius)
+            for order, (fruit_index, segment_index) in enumerate(hits):
+                p1, p2 = segments[segment_index]
+                speed = math.dist(p1, p2)
+                claim = claims.get(fruit_index)
+                if claim is None or speed > claim[0]:
+                    claims[fruit_index] = (speed, player.index, order, p1, p2)
+        
+        # Slice in player order, each player's fruits in blade order
+        for fruit_index, (_, index, _, p1, p2) in sorted(claims.items(), key=lambda item: item[1][1:3]):
+            player = self.engine.players[index]
+            slice_angle = math.degrees(math.atan2(p2[1] - p1[1], p2[0] - p1[0]))
+            
+            fruits.slice(active[fruit_index], self.game_clock.get_ticks(), slice_angle)
+            self.engine.play_slice_sound()
+            player.score += 10 * (player.combo + 1)
+            self.engine.update_combo(self.game_clock.get_ticks(), player)
     
     def draw_ui(self):
-        # Draw score with glow effect
-        score_text = f'Score: {self.engine.score}'
-        
-        # Glow effect
-        glow_size = int(36 * self.scale_y + math.sin(pygame.time.get_ticks() * 0.005) * 2)
-        glow_font = pygame.font.Font('fonts/ninja.ttf', glow_size) if os.path.exists('fonts/ninja.ttf') else pygame.font.Font(None, glow_size)
-        glow_surface = glow_font.render(score_text, True, UI_BLUE)
-        glow_rect = glow_surface.get_rect(topleft=(20 * self.scale_x, 20 * self.scale_y))
-        
-        # Apply glow
-        for offset in [(2, 2), (-2, -2), (2, -2), (-2, 2)]:
-            self.screen.blit(glow_surface, (glow_rect.x + offset[0], glow_rect.y + offset[1]))
-        
-        # Main score text
-        score_surface = self.font.render(score_text, True, UI_WHITE)
-        self.screen.blit(score_surface, (20 * self.scale_x, 20 * self.scale_y))
-        
-        # Draw combo with animation
-        if self.engine.combo > 1:
-            combo_text = f'Combo x{self.engine.combo}!'
-            scale = 1.0 + math.sin(pygame.time.get_ticks() * 0.01) * 0.1
-            combo_surface = self.small_font.render(combo_text, True, UI_GOLD)
-            scaled_surface = pygame.transform.scale(combo_surface, 
-                (int(combo_surface.get_width() * scale * self.scale_x),
-                 int(combo_surface.get_height() * scale * self.scale_y)))
-            combo_pos = (self.screen_width // 2 - scaled_surface.get_width() // 2, 
-                        50 * self.scale_y)
-            self.screen.blit(scaled_surface, combo_pos)
+        players = self.engine.players
+        column = self.screen_width / len(players)
+        for player in players:
+            # One column per player along the top; a single player keeps the classic layout
+            if len(players) == 1:
+                score_text = f'Score: {player.score}'
+            else:
+                score_text = f'P{player.index + 1}: {player.score}'
+            left = player.index * column + 20 * self.scale_x
+            top = 20 * self.scale_y
+            
+            # Glow effect (one cached surface per glow size, rebuilt only when the score changes)
+            glow_size = int(36 * self.scale_y + math.sin(self.game_clock.get_ticks() * 0.005) * 2)
+            glow_color = PLAYER_COLORS[player.index % len(PLAYER_COLORS)]
+            glow_surface = text_cache.text(UI_FONT, glow_size, glow_color, score_text, player.index)
+            glow_rect = glow_surface.get_rect(topleft=(left, top))
+            
+            # Apply glow
+            for offset in GLOW_OFFSETS[:self.glow_passes]:
+                self.queue.submit(LAYER_UI, glow_surface, (glow_rect.x + offset[0], glow_rect.y + offset[1]))
+            self.mark_dirty(glow_rect.inflate(4, 4))
+            
+            # Main score text
+            score_surface = text_cache.text(UI_FONT, 36, UI_WHITE, score_text, player.index)
+            self.mark_dirty(self.queue.submit(LAYER_UI + 1, score_surface, (left, top)))
+            
+            # Draw combo with animation (centered, or under the player's score)
+            if player.combo > 1:
+                combo_text = f'Combo x{player.combo}!'
+                scale = 1.0 + math.sin(self.game_clock.get_ticks() * 0.01) * 0.1
+                scaled_surface = self.combo_pulses[player.index].frame(combo_text, scale, self.scale_x, self.scale_y)
+                if len(players) == 1:
+                    combo_pos = (self.screen_width // 2 - scaled_surface.get_width() // 2, 
+                                50 * self.scale_y)
+                else:
+                    combo_pos = (left, 70 * self.scale_y)
+                self.mark_dirty(self.queue.submit(LAYER_UI + 1, scaled_surface, combo_pos))
     
-    def run(self):
-        running = True
+    def run(self, max_frames=None):
+        for pipeline in self.pipelines:
+            pipeline.start()
+        frames = 0
+        fruit_updates = particle_updates = blade_points = 0
+        start_time = time.perf_counter()
+        frame_start = start_time
+        replay_mismatch = None  # First frame whose fruits or score differ from the recording
+        startup_logged = False
+        running = self.replay is None or len(self.replay) > 0
+        profiler = self.profiler
         while running:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            frame_ms = (now - frame_start) * 1000
+            frame_start = now
+            frame_ticks = self.game_clock.get_ticks()
+            
             # Event handling
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -241,55 +568,282 @@ class FruitNinja:
                             running = False
                     elif event.key == pygame.K_f:
                         self.toggle_fullscreen()
+                    elif event.key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET) and self.pipeline and self.pipeline.motion_model:
+                        step = 1 if event.key == pygame.K_RIGHTBRACKET else -1
+                        every = self.pipeline.schedule.every + step
+                        for pipeline in self.pipelines:
+                            every = pipeline.set_inference_interval(every)
+                        print(f"Hand inference every {every} frame(s)")
+                    elif event.key == pygame.K_F3:
+                        profiler.enable()
+                        profiler.show_overlay = not profiler.show_overlay
+            profiler.lap('events')
             
-            # Draw background
-            self.engine.draw_background(self.screen)
+            # Draw background (or just restore last frame's dirty areas)
+            if self.renderer is not None:
+                self.renderer.begin_frame()
+            else:
+                self.engine.draw_background(self.screen)
+            profiler.lap('background')
             
-            # Process hand tracking
-            ret, frame = self.cap.read()
-            if ret:
-                frame = cv2.flip(frame, 1)
-                hand_x, hand_y, velocity, vel_vector = self.hand_tracker.get_hand_position(frame)
-                
+            # Hand input for every player: recorded, or the freshest samples from the cameras
+            if self.replay is not None:
+                if bool(self.replay.records['flags'][frames] & FLAG_FULLSCREEN) != self.is_fullscreen:
+                    self.toggle_fullscreen()
+                player_inputs = self.replay.player_inputs(frames)
+                preview = (self.replay_frame, [hand for hand, _ in player_inputs], True)
+            elif not self.pipelines:
+                # Cameras and trackers are still starting up; play on without hands
+                if self.startup.done(self.input_names):
+                    self.attach_inputs()
+                    for pipeline in self.pipelines:
+                        pipeline.start()
+                    self.startup.record('inputs ready', self.startup.now_ms())
+                player_inputs = [(NO_HAND, False)] * len(self.player_slots)
+                preview = None
+                self.draw_startup_status()
+            else:
+                # Never waits on the cameras
+                samples = [pipeline.latest_sample() for pipeline in self.pipelines]
+                player_inputs = []
+                for camera, slot in self.player_slots:
+                    sample, is_new = samples[camera]
+                    player_inputs.append((sample.hands[slot], is_new) if sample is not None else (NO_HAND, False))
+                sample, is_new = samples[0]
+                preview = (sample.frame, sample.hands, is_new) if sample is not None else None
+                if is_new:
+                    profiler.record('cap_read', self.pipeline.read_ms)
+                    profiler.record('inference', self.pipeline.inference_ms)
+            profiler.lap('capture')
+            
+            # Move every player's blade and katana, collecting the new blade segments
+            segments = []
+            for player, ((hand_x, hand_y, velocity, _), is_new) in zip(self.engine.players, player_inputs):
+                blade = self.blades[player.index]
                 if hand_x is not None:
                     # Scale position to screen coordinates
                     game_x, game_y = self.scale_position(hand_x, hand_y)
                     point = (game_x, game_y)
                     
-                    # Update and draw blade trail
-                    self.blade_trail.add_point(point, velocity)
-                    self.blade_trail.draw(self.screen)
+                    # Only feed the blade with samples we haven't seen yet
+                    if is_new:
+                        blade.add_point(point, velocity)
+                    self.mark_dirty(blade.draw(self.queue))
+                    profiler.lap('blade_trail')
                     
                     # Draw katana cursor
-                    if len(self.blade_trail.points) > 1:
-                        p1 = self.blade_trail.points[-2]
-                        p2 = self.blade_trail.points[-1]
+                    if len(blade.points) > 1:
+                        p1 = blade.points[-2]
+                        p2 = blade.points[-1]
                         angle = math.degrees(math.atan2(-(p2[1] - p1[1]), p2[0] - p1[0]))
-                        self.engine.draw_katana(self.screen, point, angle)
-                    
-                    # Check collisions
-                    self.check_collisions(self.blade_trail.points)
-                
-                # Draw camera preview with tracking visualization
-                self.draw_camera_preview(frame, (hand_x, hand_y), vel_vector)
+                        self.mark_dirty(self.engine.draw_katana(self.queue, point, angle, player))
+                    profiler.lap('katana')
+                segments.append(blade.take_new_segments() if is_new and hand_x is not None else [])
+            
+            # Check collisions for all blades at once, then play the frame's slice sounds together
+            self.check_collisions(segments)
+            self.engine.flush_sounds()
+            profiler.lap('collisions')
+            
+            # Draw camera preview with tracking visualization (first camera)
+            if preview is not None:
+                frame, hands, refresh = preview
+                x, y, _, velocity = hands[0]
+                self.draw_camera_preview(frame, (x, y), velocity, refresh, hands[1:])
+                profiler.lap('preview')
+            
+            # Update and draw juice particles in one batch
+            self.particles.update()
+            self.mark_dirty(self.particles.draw(self.queue))
+            profiler.lap('particles')
             
             # Update and draw fruits
             self.update_fruits()
-            for fruit in self.fruits:
-                fruit.update()
-                fruit.draw(self.screen)
+            self.fruits.update(frame_ticks)
+            self.mark_dirty(self.fruits.draw(self.queue, frame_ticks))
+            profiler.lap('fruits')
             
             # Draw UI
             self.draw_ui()
+            profiler.lap('ui')
+            
+            # Everything queued this frame, layer by layer; the profiler overlay goes on top
+            self.queue.flush()
+            self.mark_dirty(profiler.draw(self.screen))
+            profiler.lap('flush')
             
-            # Update display
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            # Update display (headless runs skip the flip and run as fast as the CPU allows).
+            # Only the direct-to-window mode can push just the dirty rectangles.
+            if self.renderer is not None:
+                self.renderer.end_frame(present=not self.headless and self.render_size is None)
+            if not self.headless and (self.renderer is None or self.render_size is not None):
+                self.present()
+            profiler.lap('present')
+            if frames == 0:
+                self.startup.record('first frame', self.startup.now_ms())
+            if not startup_logged and self.startup.done(self.input_names):
+                self.startup.log()
+                startup_logged = True
+            
+            # Let the governor judge this frame's work, before the wait for the next tick
+            if self.governor is not None and self.governor.observe((time.perf_counter() - now) * 1000):
+                self.apply_quality()
+                print(f"Quality: {QUALITY_TIERS[self.quality_tier]['name']}")
+            if not self.headless:
+                self.clock.tick(FPS)
+            
+            # Log the frame, or check the replay still matches the recording
+            if self.recorder is not None or self.replay is not None:
+                state = state_hash(self.fruits.state())
+                score = self.engine.total_score
+                if self.recorder is not None:
+                    flags = FLAG_FULLSCREEN if self.is_fullscreen else 0
+                    latency = self.pipeline.latency_ms if self.pipeline else 0.0
+                    self.recorder.append(frames, frame_ticks, frame_ms, latency, flags, player_inputs, score, state)
+                else:
+                    record = self.replay.records[frames]
+                    if replay_mismatch is None and (record['state'] != state or record['score'] != score):
+                        replay_mismatch = frames
+            self.game_clock.advance()
+            profiler.end_frame()
+            
+            # Workload counters for throughput reporting
+            frames += 1
+            fruit_updates += len(self.fruits)
+            particle_updates += self.particles.count
+            blade_points += sum(len(blade.points) for blade in self.blades)
+            if max_frames is not None and frames >= max_frames:
+                running = False
+            if self.replay is not None and frames >= len(self.replay):
+                running = False
+        
+        elapsed = time.perf_counter() - start_time
+        if self.trace_path:
+            self.profiler.export(self.trace_path)
         
         # Cleanup
-        self.cap.release()
+        for pipeline, cap, tracker in zip(self.pipelines, self.caps, self.trackers):
+            pipeline.stop()
+            cap.release()
+            if isinstance(tracker, ProcessTracker):
+                tracker.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.startup.shutdown()
+        # Cached fonts don't survive pygame.quit(), drop them so a later init starts clean
+        assets.clear()
+        text_cache.clear()
         pygame.quit()
+        
+        report = {
+            'frames': frames,
+            'wall_time_s': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'fruits_per_s': fruit_updates / elapsed if elapsed > 0 else 0.0,
+            'particles_per_s': particle_updates / elapsed if elapsed > 0 else 0.0,
+            'blade_points_per_s': blade_points / elapsed if elapsed > 0 else 0.0,
+            'score': self.engine.total_score,
+            'player_scores': [player.score for player in self.engine.players],
+            'inferences_skipped': sum(pipeline.schedule.skipped for pipeline in self.pipelines),
+            'seed': self.seed,
+            'startup': self.startup.summary(),
+            'sounds_played': self.engine.slice_voices.played,
+            'sounds_merged': self.engine.slice_voices.merged,
+            'voices_stolen': self.engine.slice_voices.stolen,
+            'quality': QUALITY_TIERS[self.quality_tier]['name'],
+            'quality_changes': self.governor.changes if self.governor else 0,
+            'render': self.queue.stats(),
+            'tracker_restarts': sum(tracker.restarts for tracker in self.trackers if isinstance(tracker, ProcessTracker))
+        }
+        if self.replay is not None:
+            report['replay_mismatch_frame'] = replay_mismatch
+        if self.profiler.enabled:
+            report['stages'] = self.profiler.summary()
+        if self.headless:
+            print(f"Simulated {frames} frames in {elapsed:.2f}s ({report['fps']:.1f} FPS)")
+            print(f"  fruits/s: {report['fruits_per_s']:.0f}  particles/s: {report['particles_per_s']:.0f}  "
+                  f"blade points/s: {report['blade_points_per_s']:.0f}")
+            print(f"  slice sounds: {report['sounds_played']} played, {report['sounds_merged']} merged, "
+                  f"{report['voices_stolen']} voices stolen")
+            if self.replay is not None:
+                if replay_mismatch is None:
+                    print(f"  replay matched the recording ({len(self.replay)} frames)")
+                else:
+                    print(f"  replay diverged from the recording at frame {replay_mismatch}")
+            for stage, timing in report.get('stages', {}).items():
+                print(f"  {stage:<14} p50 {timing['p50']:8.3f}  p95 {timing['p95']:8.3f}  p99 {timing['p99']:8.3f}")
+        return report
 
 if __name__ == "__main__":
-    game = FruitNinja()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fruit Ninja Ultimate Enhanced")
+    parser.add_argument('--source', action='append', default=None,
+                        help='camera[:index], synthetic[:figure8|circle|swipe], a video file or a directory of frames '
+                             '(repeat for one camera per player group)')
+    parser.add_argument('--players', type=positive_int, default=1,
+                        help='number of tracked hands/blades, each with its own score')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a window on a fixed simulation timestep, as fast as possible')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='stop after this many frames (defaults to 3600 when headless)')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='redraw and present only the screen areas that changed each frame')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each stage of the frame and show the profiler overlay (F3 toggles it)')
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help='write per-frame stage timings to PATH (.csv or .json)')
+    parser.add_argument('--preview-fps', type=float, default=30,
+                        help='how often the camera preview is refreshed (0 = every new camera frame)')
+    parser.add_argument('--inference-budget', type=float, default=None, metavar='MS',
+                        help='adapt hand-tracking input resolution to keep inference under MS milliseconds')
+    parser.add_argument('--kalman', action='store_true',
+                        help='smooth and extrapolate the hand with a Kalman motion model')
+    parser.add_argument('--infer-every', type=int, default=1, metavar='N',
+                        help='run hand inference on every Nth camera frame ([ and ] adjust it in game)')
+    parser.add_argument('--infer-hz', type=float, default=None,
+                        help='cap hand inference at this many runs per second')
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help='log every frame\'s hand input, timing and seed to PATH')
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help='play a recorded session back frame for frame (no camera needed)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for fruit spawns (random by default, taken from the log when replaying)')
+    parser.add_argument('--audio-buffer', type=int, default=MIXER_BUFFER, metavar='FRAMES',
+                        help='mixer buffer size; smaller is lower latency, raise it if sound crackles')
+    parser.add_argument('--render-size', type=parse_render_size, default=None, metavar='WxH',
+                        help='draw at this internal resolution (or xga, 720p, 1080p) and scale it to the '
+                             'window or monitor once per frame')
+    parser.add_argument('--quality', default='auto', choices=['auto'] + [tier['name'] for tier in QUALITY_TIERS],
+                        help='visual quality tier; auto drops effects when frames run over budget')
+    parser.add_argument('--inference-process', action='store_true',
+                        help='run hand tracking in its own process, fed through shared memory '
+                             '(always on with several cameras)')
+    parser.add_argument('--roi-tracking', action='store_true',
+                        help='run hand inference on a crop around the predicted hand (measure it against '
+                             'full-frame tracking with benchmarks/hot_paths.py --frames-dir first)')
+    parser.add_argument('--anchor', default='palm', choices=list(BLADE_ANCHORS),
+                        help='where the blade sits on the hand: palm (steadiest), index fingertip '
+                             '(most precise) or blade (between index and middle fingertips)')
+    parser.add_argument('--fruits', type=int, default=None, metavar='N',
+                        help='keep N fruits in the air instead of 3 to 8 (stress test, e.g. --headless --fruits 4000)')
+    args = parser.parse_args()
+    init_pygame()
+    
+    max_frames = args.frames
+    if max_frames is None and args.headless and not args.replay:
+        max_frames = 3600
+    
+    # The game keeps 3 to 8 fruits around; a stress run keeps N in the air
+    min_fruits, max_fruits = 3, 8
+    if args.fruits:
+        min_fruits, max_fruits = args.fruits, max(8, args.fruits * 2)
+    
+    game = FruitNinja(source=args.source, headless=args.headless, dirty_rects=args.dirty_rects,
+                      profile=args.profile, trace_path=args.trace, preview_fps=args.preview_fps,
+                      inference_budget_ms=args.inference_budget, motion_model=args.kalman,
+                      infer_every=args.infer_every, infer_hz=args.infer_hz, players=args.players,
+                      record_path=args.record, replay_path=args.replay, seed=args.seed,
+                      audio_buffer=args.audio_buffer, render_size=args.render_size,
+                      quality=args.quality, inference_process=args.inference_process,
+                      anchor=args.anchor, roi_tracking=args.roi_tracking,
+                      min_fruits=min_fruits, max_fruits=max_fruits)
+    game.run(max_frames)
\ No newline at end of file
@@ -0,0 +1,261 @@
+import math
+import numpy as np
+import pygame
+from game_objects import Fruit, spawn_random
+from particles import particle_pool
+from sprite_cache import rotations
+from render_queue import LAYER_FRUITS
+
+class FruitWorld:
+    # Every fruit's state in parallel arrays, one slot per fruit. A fruit in
+    # flight is ballistic from its launch, so its position is evaluated in
+    # closed form for any timestamp instead of being stepped: with n the
+    # (fractional) number of 60 fps steps since launch,
+    #   x = x0 + vx * n + wobble(n)
+    #   y = y0 + vy * n + gravity * n * (n - 1) / 2
+    #   rotation = spin * n
+    # which is exactly where the old per-frame integration put it after n
+    # frames. Updates, off-screen checks and respawns are a few array ops for
+    # the whole world, however many fruits it holds.
+    def __init__(self, capacity, window_width, window_height, particles=particle_pool,
+                 step_ms=1000 / 60, gravity=0.4, wobble_amplitude=1.0, wobble_speed=0.015):
+        self.capacity = capacity
+        self.WINDOW_WIDTH = window_width
+        self.WINDOW_HEIGHT = window_height
+        self.particles = particles
+        self.step_ms = step_ms
+        self.gravity = gravity  # Reduced gravity for higher arcs
+        self.wobble_amplitude = wobble_amplitude
+        self.wobble_speed = wobble_speed  # Radians per millisecond of the sideways wobble
+
+        # Images are decoded and scaled once per process and shared by every fruit
+        self.images = Fruit.preload()
+        self.fruit_types = list(self.images.keys())
+        self.colors = [Fruit.fruit_colors.get(name, (255, 100, 0)) for name in self.fruit_types]
+
+        # Launch state, fixed for a whole flight (or rebased on a resize)
+        self.x0 = np.zeros(capacity)
+        self.y0 = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.t0 = np.zeros(capacity)  # Launch ticks
+        self.rotation0 = np.zeros(capacity)
+        self.spin = np.zeros(capacity)
+        self.type = np.zeros(capacity, dtype=np.int32)  # Index into self.fruit_types
+
+        # Where the last update() left each fruit, and where it was before that
+        # (for swept collision). Sliced fruits stay where they were cut.
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.rotation = np.zeros(capacity)
+
+        self.sliced = np.zeros(capacity, dtype=bool)
+        self.slice_time = np.zeros(capacity)
+        self.slice_direction = np.zeros(capacity)  # Used for slice animation direction
+        self.left_rotation = np.zeros(capacity)
+        self.right_rotation = np.zeros(capacity)
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.serial = np.zeros(capacity, dtype=np.int64)  # Spawn order, oldest lowest
+        self.spawned = 0
+        self._live = None
+        self._active = None
+        self.updated_at = None  # Ticks of the last update(), whose positions draw() can reuse
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def live(self):
+        # Slots in use, in spawn order (oldest first)
+        if self._live is None:
+            slots = np.flatnonzero(self.alive)
+            self._live = slots[np.argsort(self.serial[slots], kind='stable')]
+        return self._live
+
+    def active(self):
+        # Live slots still in flight, in spawn order
+        if self._active is None:
+            live = self.live()
+            self._active = live[~self.sliced[live]]
+        return self._active
+
+    def spawn(self, now, count=1):
+        # Free slots first; when the world is full the oldest fruits are
+        # recycled, like the old fruit list did
+        count = min(count, self.capacity)
+        free = np.flatnonzero(~self.alive)[:count]
+        if len(free) < count:
+            recycled = self.live()[:count - len(free)]
+            free = np.concatenate((free, recycled))
+        self.serial[free] = np.arange(self.spawned, self.spawned + len(free))
+        self.spawned += len(free)
+        self.alive[free] = True
+        self._live = self._active = None
+        self.launch(free, now)
+        return free
+
+    def launch(self, slots, now):
+        # New flights from below the screen. Each fruit's draws come from
+        # spawn_random in a fixed order, so seeded sessions stay repeatable.
+        draws = []
+        types = len(self.fruit_types)
+        for _ in range(len(slots)):
+            draws.append((spawn_random.randrange(types),
+                          spawn_random.randint(100, self.WINDOW_WIDTH - 100),
+                          spawn_random.uniform(-4, 4),
+                          spawn_random.uniform(-32, -28),  # Higher initial velocity
+                          spawn_random.uniform(-8, 8),
+                          spawn_random.uniform(-12, -8),
+                          spawn_random.uniform(8, 12)))
+        if not draws:
+            return
+        draws = np.array(draws)
+        self.type[slots] = draws[:, 0]
+        self.x0[slots] = self.x[slots] = self.prev_x[slots] = draws[:, 1]
+        self.y0[slots] = self.y[slots] = self.prev_y[slots] = self.WINDOW_HEIGHT + 50
+        self.vx[slots] = draws[:, 2]
+        self.vy[slots] = draws[:, 3]
+        self.spin[slots] = draws[:, 4]
+        self.left_rotation[slots] = draws[:, 5]
+        self.right_rotation[slots] = draws[:, 6]
+        self.t0[slots] = now
+        self.rotation0[slots] = self.rotation[slots] = 0.0
+        self.sliced[slots] = False
+        self._active = None
+        self.slice_time[slots] = 0.0
+        self.slice_direction[slots] = 0.0
+
+    def positions(self, now, slots):
+        # Closed-form (x, y, rotation) of fruits in flight at `now`, which can
+        # fall anywhere between frames. The wobble is the sum of the per-step
+        # sin(wobble_speed * ticks) terms, summed analytically.
+        t0 = self.t0[slots]
+        n = np.maximum(now - t0, 0.0) / self.step_ms
+        half_step = self.wobble_speed * self.step_ms / 2
+        turn = n * half_step
+        wobble = np.sin(turn) * np.sin(t0 * self.wobble_speed - half_step + turn)
+        x = self.x0[slots] + self.vx[slots] * n + wobble * (self.wobble_amplitude / math.sin(half_step))
+        y = self.y0[slots] + (self.vy[slots] + (n - 1) * (self.gravity / 2)) * n
+        rotation = self.rotation0[slots] + self.spin[slots] * n
+        return x, y, rotation
+
+    def update(self, now):
+        # Moves every fruit in flight to `now` and relaunches the ones that fell
+        # off the bottom of the screen
+        self.updated_at = now
+        flying = self.active()
+        if not len(flying):
+            return
+        self.prev_x[flying] = self.x[flying]
+        self.prev_y[flying] = self.y[flying]
+        x, y, rotation = self.positions(now, flying)
+        self.x[flying] = x
+        self.y[flying] = y
+        self.rotation[flying] = rotation
+        fallen = flying[y > self.WINDOW_HEIGHT + 50]
+        if len(fallen):
+            self.launch(fallen, now)
+
+    def slice(self, slot, now, slice_angle):
+        self.sliced[slot] = True
+        self._active = None
+        self.slice_time[slot] = now
+        self.slice_direction[slot] = slice_angle
+        # Particles spray perpendicular to the slice, simulated by the shared pool
+        self.particles.emit(self.x[slot], self.y[slot], slice_angle, self.colors[self.type[slot]],
+                            Fruit.particles_per_slice)
+
+    def release_finished(self, now, animation_ms=1000):
+        # Sliced fruits free their slot once their slice animation is over
+        done = self.alive & self.sliced & (now - self.slice_time >= animation_ms)
+        if done.any():
+            self.alive[done] = False
+            self._live = self._active = None
+
+    def resize(self, window_width, window_height, now):
+        # Keeps every fruit at the same relative spot on the new screen: flights
+        # are rebased to start from where they are now, with their current speed
+        sx = window_width / self.WINDOW_WIDTH
+        sy = window_height / self.WINDOW_HEIGHT
+        flying = self.active()
+        if len(flying):
+            n = (now - self.t0[flying]) / self.step_ms
+            self.x0[flying], self.y0[flying], self.rotation0[flying] = self.positions(now, flying)
+            self.vy[flying] += self.gravity * n
+            self.t0[flying] = now
+            self.x0 *= sx
+            self.y0 *= sy
+        self.x *= sx
+        self.prev_x *= sx
+        self.y *= sy
+        self.prev_y *= sy
+        self.WINDOW_WIDTH = window_width
+        self.WINDOW_HEIGHT = window_height
+
+    def state(self):
+        # (x, y, sliced) of every live fruit, for the session log's state hash
+        live = self.live()
+        return np.column_stack((self.x[live], self.y[live], self.sliced[live])).astype(np.float32)
+
+    def draw(self, queue, now):
+        # Whole fruits are drawn where they are at `now` (straight from the last
+        # update if that was for the same ticks), culled against the screen in
+        # one go and submitted as a single batch; slice animations go one by
+        # one. Returns the screen rectangles touched, for dirty-rect rendering.
+        rects = []
+        live = self.live()
+        flying = self.active()
+        if len(flying):
+            if now == self.updated_at:
+                x, y, rotation = self.x[flying], self.y[flying], self.rotation[flying]
+            else:
+                x, y, rotation = self.positions(now, flying)
+            margin = 60  # Half the diagonal of a rotated 80x80 sprite, rounded up
+            visible = (x > -margin) & (x < self.WINDOW_WIDTH + margin) & (y > -margin) & (y < self.WINDOW_HEIGHT + margin)
+
+            names, images, rotated = self.fruit_types, self.images, rotations.rotated
+            blits = []
+            pixels = 0
+            for kind, cx, cy, angle in zip(self.type[flying[visible]].tolist(), x[visible].astype(np.int32).tolist(),
+                                           y[visible].astype(np.int32).tolist(), rotation[visible].tolist()):
+                name = names[kind]
+                sprite = rotated(name, images[name], angle)
+                width, height = sprite.get_size()
+                rect = pygame.Rect(cx - width // 2, cy - height // 2, width, height)
+                blits.append((sprite, rect))
+                rects.append(rect)
+                pixels += width * height
+            queue.submit_batch(LAYER_FRUITS, blits, pixels, len(flying) - len(blits))
+
+        for slot in live[self.sliced[live] & (now - self.slice_time[live] < 1000)].tolist():
+            rects.extend(self.draw_halves(queue, slot, now))
+        return rects
+
+    def draw_halves(self, queue, slot, now):
+        # Enhanced slicing animation
+        name = self.fruit_types[self.type[slot]]
+        base_image = self.images[name]
+        x, y, rotation = float(self.x[slot]), float(self.y[slot]), float(self.rotation[slot])
+        slice_progress = (now - self.slice_time[slot]) / 1000.0
+        slice_dir = math.radians(self.slice_direction[slot])
+
+        # Calculate separation direction based on slice angle
+        separation = slice_progress * 60
+        offset_x = math.cos(slice_dir) * separation
+        offset_y = math.sin(slice_dir) * separation
+
+        rects = []
+        for side, sign, spin, crop in (('left', -1, self.left_rotation[slot], 0),
+                                       ('right', 1, self.right_rotation[slot], -40)):
+            # Each half flies off its own way with its own spin
+            half = rotations.derived((name, side), lambda crop=crop: Fruit.make_half(base_image, crop))
+            angle = rotation + slice_progress * 360 * spin
+            half_rotated = rotations.rotated((name, side), half, angle)
+            rect = half_rotated.get_rect(center=(
+                x + sign * offset_x,
+                y + sign * offset_y + slice_progress * 100  # Add downward motion
+            ))
+            rects.append(queue.submit(LAYER_FRUITS, half_rotated, rect))
+        return rects
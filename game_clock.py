@@ -0,0 +1,51 @@
+import pygame
+
+class WallClock:
+    # Real time, same as pygame.time.get_ticks()
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    def advance(self):
+        pass
+
+class FixedStepClock:
+    # Simulated time that only moves when the game loop finishes a frame
+    def __init__(self, fps=60, start_ticks=0):
+        self.step_ms = 1000.0 / fps
+        self.ticks = float(start_ticks)
+        self.frames = 0
+
+    def get_ticks(self):
+        return int(self.ticks)
+
+    def advance(self):
+        self.ticks += self.step_ms
+        self.frames += 1
+
+class LatchedClock:
+    # Another clock read once per frame, so every get_ticks() within a frame
+    # agrees. Recorded sessions use it to make the logged ticks exact.
+    def __init__(self, source):
+        self.source = source
+        self.ticks = source.get_ticks()
+
+    def get_ticks(self):
+        return self.ticks
+
+    def advance(self):
+        self.source.advance()
+        self.ticks = self.source.get_ticks()
+
+class ReplayClock:
+    # Plays back the per-frame ticks of a recorded session
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.frames = 0
+
+    def get_ticks(self):
+        return int(self.ticks[min(self.frames, len(self.ticks) - 1)])
+
+    def advance(self):
+        self.frames += 1
+
+wall_clock = WallClock()
@@ -1,99 +1,137 @@
 import pygame
 import os
 import math
-import random
+from game_clock import wall_clock
+from asset_cache import assets
+from audio import init_mixer, decode_sound, SliceVoices
+from sprite_cache import rotations
+from pools import RingBuffer
+from render_queue import LAYER_KATANA
+
+class PlayerState:
+    # Score, combo and katana motion of one blade
+    def __init__(self, index=0, max_trail_length=3):
+        self.index = index
+        self.score = 0
+        self.combo = 0
+        self.last_slice_time = 0
+        
+        # Smooth rotation
+        self.current_angle = 0
+        
+        # Motion trail
+        self.prev_positions = RingBuffer(max_trail_length)
 
 class GameEngine:
-    def __init__(self, window_width, window_height):
+    def __init__(self, window_width, window_height, clock=wall_clock, players=1):
         self.WINDOW_WIDTH = window_width
         self.WINDOW_HEIGHT = window_height
+        self.clock = clock
         
-        # Initialize audio system
-        pygame.mixer.pre_init(44100, -16, 2, 2048)
-        pygame.mixer.init()
-        
-        # Load sound effects
-        self.slice_sounds = []
-        for i in range(1, 4):
-            try:
-                sound = pygame.mixer.Sound(f'sounds/slice{i}.mp3')
-                sound.set_volume(0.5)
-                self.slice_sounds.append(sound)
-            except Exception as e:
-                print(f"Error loading sound {i}: {e}")
-        
-        if not self.slice_sounds:
-            self.slice_sounds = [pygame.mixer.Sound(buffer=bytes(44100))]
-        
-        # Load fonts
-        try:
-            self.font = pygame.font.Font('fonts/ninja.ttf', 48)
-            self.combo_font = pygame.font.Font('fonts/ninja.ttf', 24)
-        except:
-            self.font = pygame.font.Font(None, 48)
-            self.combo_font = pygame.font.Font(None, 24)
+        # Sounds and images come from the asset cache (preload() may have filled it already)
+        self.slice_sounds = GameEngine.load_sounds()
+        self.slice_voices = SliceVoices(self.slice_sounds)
         
         # Load katana cursor
-        try:
-            self.katana = pygame.image.load('cursor/katana.png')
-            self.katana = pygame.transform.scale(self.katana, (150, 150))
-        except:
-            self.katana = pygame.Surface((150, 150), pygame.SRCALPHA)
-            pygame.draw.line(self.katana, (255, 255, 255), (0, 75), (150, 75), 5)
+        self.katana = GameEngine.katana_image()
         
         # Load background
-        try:
-            self.background = pygame.image.load('background/dojo.png')
-            self.background = pygame.transform.scale(self.background, (window_width, window_height))
-        except:
-            self.background = None
+        self.load_background(window_width, window_height)
         
-        # Initialize game state
-        self.score = 0
-        self.combo = 0
-        self.last_slice_time = 0
+        # Initialize game state, one PlayerState per blade
         self.combo_duration = 1000  # milliseconds
-        
-        # Smooth rotation
-        self.current_angle = 0
         self.angle_smooth_factor = 0.2
-        
-        # Motion trail
-        self.prev_positions = []
         self.max_trail_length = 3
+        self.katana_ghosts = self.max_trail_length - 1  # Fading copies drawn behind the katana
+        self.players = [PlayerState(i, self.max_trail_length) for i in range(players)]
+    
+    # Single-player code reads and writes the first player's state directly
+    @property
+    def score(self):
+        return self.players[0].score
+    
+    @score.setter
+    def score(self, value):
+        self.players[0].score = value
+    
+    @property
+    def combo(self):
+        return self.players[0].combo
+    
+    @property
+    def total_score(self):
+        return sum(player.score for player in self.players)
+    
+    @staticmethod
+    def preload(width, height):
+        # Decodes everything __init__ needs into the asset cache; safe on a worker thread
+        GameEngine.load_sounds()
+        rotations.prewarm('katana', GameEngine.katana_image())
+        GameEngine.background_image(width, height)
+    
+    @staticmethod
+    def load_sounds():
+        # Initialize audio system (unless the game already opened it)
+        if not pygame.mixer.get_init():
+            init_mixer()
+        
+        # Load sound effects (decoded to PCM once, see audio.decode_sound)
+        slice_sounds = []
+        for i in range(1, 4):
+            try:
+                slice_sounds.append(assets.sound(f'sounds/slice{i}.mp3', loader=decode_sound))
+            except Exception as e:
+                print(f"Error loading sound {i}: {e}")
+        
+        if not slice_sounds:
+            slice_sounds = [pygame.mixer.Sound(buffer=bytes(44100))]
+        return slice_sounds
+    
+    @staticmethod
+    def katana_image():
+        return assets.image('cursor/katana.png', (150, 150), GameEngine.placeholder_katana)
+    
+    @staticmethod
+    def background_image(width, height):
+        try:
+            return assets.image('background/dojo.png', (width, height), alpha=False)
+        except:
+            return None
+    
+    @staticmethod
+    def placeholder_katana(size):
+        katana = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.line(katana, (255, 255, 255), (0, size[1] // 2), (size[0], size[1] // 2), 5)
+        return katana
+    
+    def resize(self, window_width, window_height):
+        self.WINDOW_WIDTH = window_width
+        self.WINDOW_HEIGHT = window_height
+        self.load_background(window_width, window_height)
+    
+    def load_background(self, width, height):
+        self.background = GameEngine.background_image(width, height)
     
     def play_slice_sound(self):
-        if self.slice_sounds:
-            random.choice(self.slice_sounds).play()
+        # Queued; every slice of a frame is played together by flush_sounds()
+        self.slice_voices.trigger()
     
-    def get_smooth_angle(self, target):
-        diff = (target - self.current_angle + 180) % 360 - 180
-        self.current_angle = (self.current_angle + diff * self.angle_smooth_factor) % 360
-        return self.current_angle
+    def flush_sounds(self):
+        self.slice_voices.flush()
     
-    def update_combo(self, current_time):
-        if current_time - self.last_slice_time < self.combo_duration:
-            self.combo += 1
+    def get_smooth_angle(self, target, player=None):
+        player = player or self.players[0]
+        diff = (target - player.current_angle + 180) % 360 - 180
+        player.current_angle = (player.current_angle + diff * self.angle_smooth_factor) % 360
+        return player.current_angle
+    
+    def update_combo(self, current_time, player=None):
+        player = player or self.players[0]
+        if current_time - player.last_slice_time < self.combo_duration:
+            player.combo += 1
         else:
-            self.combo = 0
-        self.last_slice_time = current_time
-    
-    def draw_ui(self, screen):
-        # Draw score with shadow
-        score_text = self.font.render(f'Score: {self.score}', True, (255, 255, 255))
-        score_shadow = self.font.render(f'Score: {self.score}', True, (0, 0, 0))
-        screen.blit(score_shadow, (22, 22))
-        screen.blit(score_text, (20, 20))
-        
-        # Draw combo with animation
-        if self.combo > 1:
-            scale = 1.0 + math.sin(pygame.time.get_ticks() * 0.01) * 0.1
-            combo_text = self.combo_font.render(f'Combo x{self.combo}!', True, (255, 215, 0))
-            scaled_text = pygame.transform.scale(combo_text, 
-                (int(combo_text.get_width() * scale), 
-                 int(combo_text.get_height() * scale)))
-            combo_pos = (self.WINDOW_WIDTH // 2 - scaled_text.get_width() // 2, 50)
-            screen.blit(scaled_text, combo_pos)
+            player.combo = 0
+        player.last_slice_time = current_time
     
     def draw_background(self, screen):
         if self.background:
@@ -101,28 +139,34 @@ class GameEngine:
         else:
             screen.fill((20, 20, 50))
     
-    def draw_katana(self, screen, position, angle):
+    def draw_katana(self, queue, position, angle, player=None):
+        player = player or self.players[0]
         # Update motion trail
-        self.prev_positions.append((position, angle))
-        if len(self.prev_positions) > self.max_trail_length:
-            self.prev_positions.pop(0)
+        player.prev_positions.append((position, angle))
         
-        # Draw motion trail
-        for i, (pos, ang) in enumerate(self.prev_positions[:-1]):
+        # Draw motion trail (the newest `katana_ghosts` positions)
+        rects = []
+        for i in range(max(len(player.prev_positions) - 1 - self.katana_ghosts, 0), len(player.prev_positions) - 1):
+            pos, ang = player.prev_positions[i]
             alpha = 100 - (i * 30)  # Fade out trailing images
-            ghost = self.katana.copy()
-            ghost.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            ghost = rotations.derived(('katana', alpha), lambda: self.make_ghost(alpha))
             
-            smooth_angle = self.get_smooth_angle(ang)
-            rotated = pygame.transform.rotate(ghost, smooth_angle)
+            smooth_angle = self.get_smooth_angle(ang, player)
+            rotated = rotations.rotated(('katana', alpha), ghost, smooth_angle)
             rect = rotated.get_rect(center=pos)
-            screen.blit(rotated, rect)
+            rects.append(queue.submit(LAYER_KATANA, rotated, rect))
         
         # Draw main katana with smooth rotation and slight wobble
-        smooth_angle = self.get_smooth_angle(angle)
-        wobble = math.sin(pygame.time.get_ticks() * 0.01) * 2
+        smooth_angle = self.get_smooth_angle(angle, player)
+        wobble = math.sin(self.clock.get_ticks() * 0.01) * 2
         final_angle = smooth_angle + wobble
         
-        rotated_katana = pygame.transform.rotate(self.katana, final_angle)
+        rotated_katana = rotations.rotated('katana', self.katana, final_angle)
         katana_rect = rotated_katana.get_rect(center=position)
-        screen.blit(rotated_katana, katana_rect)
\ No newline at end of file
+        rects.append(queue.submit(LAYER_KATANA, rotated_katana, katana_rect))
+        return rects
+    
+    def make_ghost(self, alpha):
+        ghost = self.katana.copy()
+        ghost.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+        return ghost
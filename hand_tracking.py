@@ -1,50 +1,260 @@
 import cv2
-import mediapipe as mp
+import time
 import numpy as np
-from collections import deque
 
-class HandTracker:
+# Where on the hand the blade sits, as weights over MediaPipe's 21 landmarks,
+# so any anchor is one (21,) @ (21, 2) product:
+#   palm   centroid of the wrist and finger bases (steadiest)
+#   index  index fingertip (most precise, jitters more)
+#   blade  middle of the index-to-middle-fingertip segment (two-finger blade)
+BLADE_ANCHORS = {
+    'palm': {0: 0.2, 5: 0.2, 9: 0.2, 13: 0.2, 17: 0.2},
+    'index': {8: 1.0},
+    'blade': {8: 0.5, 12: 0.5}
+}
+
+def anchor_weights(anchor):
+    weights = np.zeros(21)
+    for landmark, weight in BLADE_ANCHORS[anchor].items():
+        weights[landmark] = weight
+    return weights
+
+def landmark_array(hand_landmarks, roi=(0.0, 0.0, 1.0, 1.0)):
+    # MediaPipe's landmarks as one (21, 3) array, x/y mapped from the crop to the frame
+    points = np.array([(point.x, point.y, point.z) for point in hand_landmarks.landmark])
+    roi_x, roi_y, roi_w, roi_h = roi
+    points[:, 0] = roi_x + roi_w * points[:, 0]
+    points[:, 1] = roi_y + roi_h * points[:, 1]
+    return points
+
+class HandTrack:
+    # Smoothed position and velocity of one tracked hand (one player slot)
+    history_length = 8  # Reduced for faster response
+    
+    # Position smoothing: linearly rising weights over the history, oldest
+    # first, normalized. One row per history length, built once.
+    smoothing_weights = [None] + [np.linspace(1, 3, n) / np.linspace(1, 3, n).sum()
+                                  for n in range(1, history_length + 1)]
+    
     def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.6,  # Reduced for better responsiveness
-            min_tracking_confidence=0.6,
-            model_complexity=0
-        )
-        self.points_history = deque(maxlen=8)  # Reduced for faster response
+        self.history = np.zeros((self.history_length, 2))  # Newest point last
+        self.history_count = 0
         self.prev_point = None
+        self.raw_point = None  # Unsmoothed palm center of the last frame, None if not detected
+        self.last_seen = None  # Last detected position, kept after the track is lost
+        self.hand_size = None  # Last landmark extent (w, h), normalized to the frame
         self.lost_tracking_frames = 0
         self.max_lost_frames = 5  # Reduced for quicker recovery
         
         # Movement prediction
         self.velocity = (0, 0)
+        self.velocity_vector = np.zeros(2)
         self.smooth_factor = 0.5  # Increased for more direct movement
         self.prediction_decay = 0.8  # Slower velocity decay
+    
+    @property
+    def active(self):
+        return self.prev_point is not None
+    
+    def predicted(self):
+        return self.prev_point[0] + self.velocity[0], self.prev_point[1] + self.velocity[1]
+    
+    def observe(self, x, y, hand_size):
+        self.lost_tracking_frames = 0
+        self.hand_size = hand_size
         
-    def process_frame(self, frame):
-        # Resize frame for faster processing
-        small_frame = cv2.resize(frame, (320, 240))
-        rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        # Store point in history
+        self.raw_point = (x, y)
+        self.last_seen = (x, y)
+        history = self.history
+        history[:-1] = history[1:]
+        history[-1] = (x, y)
+        self.history_count = min(self.history_count + 1, self.history_length)
         
-        # Scale factor for converting coordinates back to original size
-        height, width = frame.shape[:2]
-        scale_x = width / 320
-        scale_y = height / 240
+        # Calculate smooth position using weighted average
+        count = self.history_count
+        if count >= 3:
+            current_point = self.smoothing_weights[count] @ history[-count:]
+        else:
+            current_point = history[-1].copy()
         
-        return results, (scale_x, scale_y)
+        # Calculate velocity with smoothing
+        if self.prev_point is not None:
+            delta = (current_point - self.prev_point) * 1.5  # Increased movement range
+            self.velocity_vector = self.velocity_vector * (1 - self.smooth_factor) + delta * self.smooth_factor
+            velocity = np.hypot(*self.velocity_vector) * 1000
+        else:
+            velocity = 0
+        self.velocity = (float(self.velocity_vector[0]), float(self.velocity_vector[1]))
+        
+        self.prev_point = current_point
+        return float(current_point[0]), float(current_point[1]), velocity, self.velocity
     
-    def draw_tracking_info(self, frame, hand_pos, velocity):
-        # Create a copy of the frame to avoid modifying the original
-        overlay = frame.copy()
+    def coast(self):
+        self.raw_point = None
+        
+        # Handle lost tracking with motion prediction
+        if self.prev_point is not None and self.lost_tracking_frames < self.max_lost_frames:
+            self.lost_tracking_frames += 1
+            # Predict next position using last known velocity
+            predicted_x = self.prev_point[0] + self.velocity[0]
+            predicted_y = self.prev_point[1] + self.velocity[1]
+            # Decay velocity during prediction
+            self.velocity_vector = self.velocity_vector * self.prediction_decay
+            self.velocity = (float(self.velocity_vector[0]), float(self.velocity_vector[1]))
+            return float(predicted_x), float(predicted_y), 0, self.velocity
+        
+        self.prev_point = None
+        self.hand_size = None
+        self.history_count = 0
+        self.velocity = (0, 0)
+        self.velocity_vector = np.zeros(2)
+        return None, None, 0, (0, 0)
+
+class HandTracker:
+    # Inference input sizes, smallest first; the budget controller moves between them
+    resolutions = [(160, 120), (224, 168), (320, 240), (416, 312)]
+    
+    def __init__(self, roi_tracking=False, inference_budget_ms=None, max_hands=1, anchor='palm'):
+        # MediaPipe takes most of a second to import, so only trackers pay for it
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+        self.hands = self._make_hands(max_hands)
+        # Crops move and change size every frame, which would throw off video
+        # mode's landmark tracking (it reuses the last landmarks, normalized to
+        # the last input, as the next ROI). They go through their own graph in
+        # static image mode, built on first use, and the video-mode graph only
+        # ever sees full frames.
+        self.crop_hands = None
+        
+        # One track per player slot; detections are matched to slots every frame
+        self.max_hands = max_hands
+        self.tracks = [HandTrack() for _ in range(max_hands)]
+        self.match_distance = 0.2  # Furthest a hand can be from its predicted spot and keep its slot
         
-        # Add semi-transparent overlay for better visibility
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+        # Landmark weights of the blade anchor, see BLADE_ANCHORS
+        self.anchor = anchor
+        self.anchor_weights = anchor_weights(anchor)
+        
+        # Region of interest around the predicted hand position. Off by default:
+        # crops need the static-image graph (palm detection on every call),
+        # which has not been shown to beat video-mode landmark tracking on
+        # real footage; compare with benchmarks/hot_paths.py --frames-dir
+        self.roi_tracking = roi_tracking
+        self.roi_scale = 2.2  # Crop side relative to the hand's extent
+        self.roi_min = 0.35  # Smallest crop, as a fraction of frame height
+        self.roi = None  # Crop used by the last inference (x0, y0, x1, y1) in pixels
+        self.roi_frames = 0
+        self.full_frames = 0
+        
+        # Adaptive input resolution
+        self.inference_budget_ms = inference_budget_ms
+        self.level = 2  # Index into resolutions, starts at the old fixed 320x240
+        self.max_level = len(self.resolutions) - 1  # Lowered by the quality governor
+        self.inference_ms = 0.0  # Smoothed time per inference
+        self.level_cooldown = 0
+        
+    def _make_hands(self, max_hands, static_image_mode=False):
+        return self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_hands,
+            min_detection_confidence=0.6,  # Reduced for better responsiveness
+            min_tracking_confidence=0.6,
+            model_complexity=0
+        )
+    
+    @property
+    def raw_point(self):
+        return self.tracks[0].raw_point
+    
+    @property
+    def raw_points(self):
+        return [track.raw_point for track in self.tracks]
+    
+    def predicted_roi(self, width, height):
+        # Square crop around where the hand should be this frame, or None for a full search.
+        # Only single-hand tracking crops; with several players the whole frame is searched.
+        track = self.tracks[0]
+        if (not self.roi_tracking or len(self.tracks) > 1 or not track.active
+                or track.hand_size is None or track.lost_tracking_frames):
+            return None
+        cx, cy = track.predicted()
+        cx, cy = cx * width, cy * height
+        motion = max(abs(track.velocity[0]) * width, abs(track.velocity[1]) * height)
+        side = max(track.hand_size[0] * width, track.hand_size[1] * height) * self.roi_scale + motion * 2
+        side = int(min(max(side, self.roi_min * height), height))
+        if side >= height:
+            return None
+        x0 = int(min(max(cx - side / 2, 0), width - side))
+        y0 = int(min(max(cy - side / 2, 0), height - side))
+        return x0, y0, x0 + side, y0 + side
+    
+    def _adjust_resolution(self, elapsed_ms):
+        # Exponential average of inference time, stepping the input size to stay in budget
+        self.inference_ms = elapsed_ms if not self.inference_ms else self.inference_ms * 0.8 + elapsed_ms * 0.2
+        if self.inference_budget_ms is None:
+            return
+        if self.level_cooldown:
+            self.level_cooldown -= 1
+            return
+        if self.inference_ms > self.inference_budget_ms * 1.1 and self.level > 0:
+            self.level -= 1
+            self.level_cooldown = 15
+        elif self.inference_ms < self.inference_budget_ms * 0.6 and self.level < self.max_level:
+            self.level += 1
+            self.level_cooldown = 30
+    
+    def _infer(self, frame, roi):
+        height, width = frame.shape[:2]
+        target_w, target_h = self.resolutions[min(self.level, self.max_level)]
+        if roi is None:
+            crop = frame
+            size = (target_w, target_h)
+        else:
+            x0, y0, x1, y1 = roi
+            crop = frame[y0:y1, x0:x1]
+            # Never upscale the crop; the hand already covers more of it than of the full frame
+            side = min(x1 - x0, target_w)
+            size = (side, side)
+        small_frame = cv2.resize(crop, size)
+        rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+        if roi is None:
+            return self.hands.process(rgb_frame)
+        if self.crop_hands is None:
+            self.crop_hands = self._make_hands(self.max_hands, static_image_mode=True)
+        return self.crop_hands.process(rgb_frame)
+    
+    def process_frame(self, frame):
+        # Returns MediaPipe's results plus the region they are normalized to,
+        # as (x, y, w, h) fractions of the full frame
+        height, width = frame.shape[:2]
+        start = time.perf_counter()
+        roi = self.predicted_roi(width, height)
+        results = self._infer(frame, roi) if roi is not None else None
+        if roi is not None and results.multi_hand_landmarks:
+            self.roi_frames += 1
+        else:
+            # Lost the hand (or never had it): search the whole frame
+            roi = None
+            results = self._infer(frame, None)
+            self.full_frames += 1
+        self.roi = roi
+        self._adjust_resolution((time.perf_counter() - start) * 1000)
+        
+        if roi is None:
+            return results, (0.0, 0.0, 1.0, 1.0)
+        x0, y0, x1, y1 = roi
+        return results, (x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height)
+    
+    @staticmethod
+    def draw_tracking_info(frame, hand_pos, velocity):
+        # Draws in place; sizes are tuned for 640x480 and scale with the frame,
+        # so this can run on an already downsized preview
+        scale = frame.shape[1] / 640
         
         # Draw tracking boundary
-        margin = 50
+        margin = int(50 * scale)
         cv2.rectangle(frame, 
                      (margin, margin), 
                      (frame.shape[1]-margin, frame.shape[0]-margin), 
@@ -56,20 +266,20 @@ class HandTracker:
             # Draw hand position with dynamic size based on velocity
             if isinstance(velocity, tuple) and len(velocity) == 2:
                 speed = np.sqrt(velocity[0]**2 + velocity[1]**2) * 1000
-                radius = int(10 + min(speed * 0.1, 10))  # Dynamic circle size
+                radius = int((10 + min(speed * 0.1, 10)) * scale)  # Dynamic circle size
                 
                 # Draw outer glow
-                cv2.circle(frame, (x, y), radius + 4, (255, 255, 255), 2)
+                cv2.circle(frame, (x, y), radius + int(4 * scale), (255, 255, 255), 2)
                 # Draw inner circle
                 cv2.circle(frame, (x, y), radius, (0, 255, 0), -1)
                 
                 # Draw movement vector
                 if abs(velocity[0]) > 0.001 or abs(velocity[1]) > 0.001:
-                    end_x = x + int(velocity[0] * 100)  # Increased vector length
-                    end_y = y + int(velocity[1] * 100)
+                    end_x = x + int(velocity[0] * 100 * scale)  # Increased vector length
+                    end_y = y + int(velocity[1] * 100 * scale)
                     # Draw arrow with glow effect
-                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (255, 255, 255), 4)
-                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (0, 255, 0), 2)
+                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (255, 255, 255), max(int(4 * scale), 2))
+                    cv2.arrowedLine(frame, (x, y), (end_x, end_y), (0, 255, 0), max(int(2 * scale), 1))
             
             # Draw tracking area guides
             guide_color = (0, 255, 0)
@@ -79,76 +289,74 @@ class HandTracker:
             # Draw "No Hand Detected" message
             text = "No Hand Detected"
             font = cv2.FONT_HERSHEY_SIMPLEX
-            text_size = cv2.getTextSize(text, font, 1, 2)[0]
+            text_size = cv2.getTextSize(text, font, scale, 2)[0]
             text_x = (frame.shape[1] - text_size[0]) // 2
             text_y = frame.shape[0] // 2
             
             # Draw text with glow effect
-            cv2.putText(frame, text, (text_x+2, text_y+2), font, 1, (0, 0, 0), 3)
-            cv2.putText(frame, text, (text_x, text_y), font, 1, (0, 0, 255), 2)
+            cv2.putText(frame, text, (text_x+2, text_y+2), font, scale, (0, 0, 0), 3)
+            cv2.putText(frame, text, (text_x, text_y), font, scale, (0, 0, 255), 2)
         
         return frame
     
     def get_hand_position(self, frame):
-        results, scale = self.process_frame(frame)
+        # First player's (x, y, speed, velocity)
+        return self.get_hands(frame)[0]
+    
+    def get_hands(self, frame):
+        # (x, y, speed, velocity) for every player slot, (None, None, 0, (0, 0)) when empty
+        results, (roi_x, roi_y, roi_w, roi_h) = self.process_frame(frame)
         
-        if results.multi_hand_landmarks:
-            self.lost_tracking_frames = 0
-            hand_landmarks = results.multi_hand_landmarks[0]
-            
-            # Use palm center for more stable tracking
-            palm_points = [0, 5, 9, 13, 17]  # Wrist and finger base points
-            x = sum(hand_landmarks.landmark[i].x for i in palm_points) / len(palm_points)
-            y = sum(hand_landmarks.landmark[i].y for i in palm_points) / len(palm_points)
-            
-            # Store point in history
-            self.points_history.append((x, y))
+        detections = []
+        for hand_landmarks in results.multi_hand_landmarks or []:
+            # Blade anchor, mapped from the crop back to the frame
+            points = landmark_array(hand_landmarks, (roi_x, roi_y, roi_w, roi_h))
+            x, y = self.anchor_weights @ points[:, :2]
             
-            # Calculate smooth position using weighted average
-            if len(self.points_history) >= 3:
-                weights = np.linspace(1, 3, len(self.points_history))
-                weights = weights / weights.sum()
-                
-                smooth_x = sum(p[0] * w for p, w in zip(self.points_history, weights))
-                smooth_y = sum(p[1] * w for p, w in zip(self.points_history, weights))
-                current_point = (smooth_x, smooth_y)
-            else:
-                current_point = (x, y)
-            
-            # Calculate velocity with smoothing
-            if self.prev_point:
-                dx = (current_point[0] - self.prev_point[0]) * 1.5  # Increased movement range
-                dy = (current_point[1] - self.prev_point[1]) * 1.5
-                
-                # Smooth velocity
-                self.velocity = (
-                    self.velocity[0] * (1 - self.smooth_factor) + dx * self.smooth_factor,
-                    self.velocity[1] * (1 - self.smooth_factor) + dy * self.smooth_factor
-                )
-                velocity = np.sqrt(self.velocity[0]**2 + self.velocity[1]**2) * 1000
-            else:
-                velocity = 0
-            
-            self.prev_point = current_point
-            return current_point[0], current_point[1], velocity, self.velocity
+            # Hand extent sizes the next frame's crop
+            width, height = np.ptp(points[:, :2], axis=0)
+            detections.append((float(x), float(y), (float(width), float(height))))
         
-        # Handle lost tracking with motion prediction
-        if self.prev_point and self.lost_tracking_frames < self.max_lost_frames:
-            self.lost_tracking_frames += 1
-            # Predict next position using last known velocity
-            predicted_x = self.prev_point[0] + self.velocity[0]
-            predicted_y = self.prev_point[1] + self.velocity[1]
-            # Decay velocity during prediction
-            self.velocity = (
-                self.velocity[0] * self.prediction_decay,
-                self.velocity[1] * self.prediction_decay
-            )
-            return predicted_x, predicted_y, 0, self.velocity
+        assignment = self.assign(detections)
+        hands = []
+        for slot, track in enumerate(self.tracks):
+            detection = assignment.get(slot)
+            hands.append(track.observe(*detection) if detection else track.coast())
+        return hands
+    
+    def assign(self, detections):
+        # Maps slot -> detection. Live tracks keep the detection nearest their
+        # predicted position (closest pairs first); remaining detections take
+        # the free slot whose hand was last seen nearest, then the lowest slot.
+        assignment = {}
+        pairs = []
+        for slot, track in enumerate(self.tracks):
+            if track.active:
+                px, py = track.predicted()
+                for index, (x, y, _) in enumerate(detections):
+                    distance = np.hypot(x - px, y - py)
+                    if distance < self.match_distance:
+                        pairs.append((distance, slot, index))
+        used = set()
+        for distance, slot, index in sorted(pairs):
+            if slot not in assignment and index not in used:
+                assignment[slot] = detections[index]
+                used.add(index)
         
-        self.prev_point = None
-        self.points_history.clear()
-        self.velocity = (0, 0)
-        return None, None, 0, (0, 0)
+        free = [slot for slot, track in enumerate(self.tracks) if slot not in assignment and not track.active]
+        for index, (x, y, _) in enumerate(detections):
+            if index in used or not free:
+                continue
+            def last_seen_distance(slot):
+                seen = self.tracks[slot].last_seen
+                return (np.hypot(x - seen[0], y - seen[1]) if seen else float('inf'), slot)
+            slot = min(free, key=last_seen_distance)
+            free.remove(slot)
+            assignment[slot] = detections[index]
+        return assignment
     
     def __del__(self):
-        self.hands.close()
\ No newline at end of file
+        # (the attributes are missing if the MediaPipe import failed)
+        for hands in (getattr(self, 'hands', None), getattr(self, 'crop_hands', None)):
+            if hands is not None:
+                hands.close()
\ No newline at end of file
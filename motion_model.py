@@ -0,0 +1,100 @@
+import math
+import numpy as np
+
+class HandKalmanFilter:
+    # Constant-acceleration Kalman filter over the hand position in normalized
+    # frame coordinates, timed in seconds. x and y share the same dynamics and
+    # measurement noise, so the state is one 3x2 matrix (position, velocity,
+    # acceleration per axis) with a single 3x3 covariance.
+    def __init__(self, jerk_noise=200.0, measurement_noise=0.006, max_coast=0.25):
+        self.jerk_noise = jerk_noise  # Spectral density of the white-jerk process noise
+        self.measurement_noise = measurement_noise  # Std. dev. of a detection, in frame units
+        self.max_coast = max_coast  # Seconds to extrapolate past the last detection
+        self.reset()
+
+    def reset(self):
+        self.state = np.zeros((3, 2))
+        self.covariance = np.eye(3)
+        self.time = None  # Time the state refers to
+        self.last_measurement = None
+        self.measurements = 0
+
+    @property
+    def initialized(self):
+        return self.time is not None
+
+    def _transition(self, dt):
+        F = np.array([[1.0, dt, 0.5 * dt * dt],
+                      [0.0, 1.0, dt],
+                      [0.0, 0.0, 1.0]])
+        q = self.jerk_noise
+        dt2, dt3 = dt * dt, dt * dt * dt
+        Q = q * np.array([[dt3 * dt2 / 20, dt2 * dt2 / 8, dt3 / 6],
+                          [dt2 * dt2 / 8, dt3 / 3, dt2 / 2],
+                          [dt3 / 6, dt2 / 2, dt]])
+        return F, Q
+
+    def _predict(self, t):
+        dt = max(t - self.time, 0.0)
+        F, Q = self._transition(dt)
+        return F @ self.state, F @ self.covariance @ F.T + Q
+
+    def update(self, t, x, y):
+        # Fold in a detection made at time t (e.g. the frame's capture time).
+        # A track that went stale starts over rather than extrapolating old motion.
+        if self.initialized and t - self.last_measurement > self.max_coast:
+            self.reset()
+        if not self.initialized:
+            self.state = np.array([[x, y], [0.0, 0.0], [0.0, 0.0]])
+            self.covariance = np.diag([self.measurement_noise ** 2, 1.0, 100.0])
+        else:
+            state, P = self._predict(t)
+            innovation = np.array([x, y]) - state[0]
+            S = P[0, 0] + self.measurement_noise ** 2
+            K = P[:, 0] / S
+            self.state = state + np.outer(K, innovation)
+            self.covariance = P - np.outer(K, P[0, :])
+        self.time = t
+        self.last_measurement = t
+        self.measurements += 1
+
+    def estimate(self, t):
+        # (x, y, vx, vy, sigma) at time t without changing the filter, or None
+        # if there is no track or the last detection is too old to extrapolate.
+        # Velocities are in frame units per second, sigma is the position std. dev.
+        if not self.initialized or t - self.last_measurement > self.max_coast:
+            return None
+        state, P = self._predict(t)
+        return state[0, 0], state[0, 1], state[1, 0], state[1, 1], math.sqrt(max(P[0, 0], 0.0))
+
+def frame_velocity(vx, vy, reference_fps=30):
+    # Converts a per-second velocity to HandTracker's units: the per-frame
+    # delta at a 30 fps camera times 1.5, with speed = |v| * 1000
+    scale = 1.5 / reference_fps
+    vel = (vx * scale, vy * scale)
+    return math.hypot(vel[0], vel[1]) * 1000, vel
+
+class InferenceSchedule:
+    # Decides which captured frames get hand inference: every Nth frame and/or
+    # at most `max_hz` per second. Both can be changed while running.
+    def __init__(self, every=1, max_hz=None):
+        self.every = max(int(every), 1)
+        self.max_hz = max_hz
+        self.counter = 0
+        self.last_inference = None
+        self.skipped = 0
+
+    def set_every(self, every):
+        self.every = max(int(every), 1)
+
+    def due(self, now):
+        self.counter += 1
+        if self.counter < self.every:
+            self.skipped += 1
+            return False
+        if self.max_hz and self.last_inference is not None and now - self.last_inference < 1.0 / self.max_hz:
+            self.skipped += 1
+            return False
+        self.counter = 0
+        self.last_inference = now
+        return True
@@ -0,0 +1,112 @@
+import numpy as np
+import pygame
+from render_queue import LAYER_PARTICLES
+
+class ParticleSystem:
+    # Juice particles for every fruit, stored as parallel arrays so the whole
+    # pool is integrated, aged and compacted in a handful of NumPy operations
+    def __init__(self, capacity=16384, gravity=0.3, lifetime=60, fade=4):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.lifetime = lifetime
+        self.fade = fade
+        self.count = 0
+
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.timer = np.zeros(capacity, dtype=np.int32)
+        self.alpha = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int32)  # Index into self.colors
+
+        # Pre-rendered circles, indexed by (color, radius, alpha level)
+        self.max_radius = 6
+        self.alpha_levels = 16
+        self.colors = []
+        self.color_index = {}
+        self.sprites = []
+
+        self.rng = np.random.default_rng()
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        self.count = 0
+
+    def _color_id(self, color):
+        color_id = self.color_index.get(color)
+        if color_id is None:
+            color_id = len(self.colors)
+            self.colors.append(color)
+            self.color_index[color] = color_id
+            self._render_sprites(color)
+        return color_id
+
+    def _render_sprites(self, color):
+        alpha_step = 256 // self.alpha_levels
+        for radius in range(self.max_radius + 1):
+            for level in range(self.alpha_levels):
+                diameter = max(radius * 2, 1)
+                surf = pygame.Surface((diameter, diameter), pygame.SRCALPHA)
+                pygame.draw.circle(surf, (*color[:3], level * alpha_step + alpha_step - 1), (radius, radius), radius)
+                self.sprites.append(surf)
+
+    def emit(self, x, y, slice_angle, color, amount=25, spread=45, speed=(10, 20), size=(2, 6)):
+        # Spray perpendicular to the slice
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+        start, end = self.count, self.count + amount
+        angles = np.radians(slice_angle + 90 + self.rng.uniform(-spread, spread, amount))
+        speeds = self.rng.uniform(speed[0], speed[1], amount)
+
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.vel[start:end, 0] = speeds * np.cos(angles)
+        self.vel[start:end, 1] = speeds * np.sin(angles)
+        self.timer[start:end] = self.lifetime
+        self.alpha[start:end] = 255
+        self.size[start:end] = self.rng.uniform(size[0], size[1], amount)
+        self.color[start:end] = self._color_id(color)
+        self.count = end
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n, 1] += self.gravity
+        self.timer[:n] -= 1
+        np.maximum(self.alpha[:n] - self.fade, 0, out=self.alpha[:n])
+
+        # Compact the survivors to the front of the buffers
+        alive = self.timer[:n] > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            k = len(keep)
+            for buffer in (self.pos, self.vel, self.timer, self.alpha, self.size, self.color):
+                buffer[:k] = buffer[keep]
+            self.count = k
+
+    def draw(self, queue):
+        # Submits every particle as one batch; returns the bounding box, or None
+        n = self.count
+        if n == 0:
+            return None
+        radius = np.minimum(self.size[:n].astype(np.int32), self.max_radius)
+        level = np.minimum(self.alpha[:n].astype(np.int32) * self.alpha_levels // 256, self.alpha_levels - 1)
+        sprite_ids = (self.color[:n] * (self.max_radius + 1) + radius) * self.alpha_levels + level
+        xs = (self.pos[:n, 0] - radius).astype(np.int32).tolist()
+        ys = (self.pos[:n, 1] - radius).astype(np.int32).tolist()
+
+        sprites = self.sprites
+        queue.submit_batch(LAYER_PARTICLES, [(sprites[i], (x, y)) for i, x, y in zip(sprite_ids.tolist(), xs, ys)],
+                           int(((radius * 2) ** 2).sum()))
+
+        left, top = min(xs), min(ys)
+        span = self.max_radius * 2
+        return pygame.Rect(left, top, max(xs) - left + span, max(ys) - top + span)
+
+# One pool shared by every fruit
+particle_pool = ParticleSystem()
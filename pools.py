@@ -0,0 +1,48 @@
+class RingBuffer:
+    # Fixed-capacity FIFO over a preallocated list: appending past capacity
+    # overwrites the oldest entry instead of shifting the whole list
+    __slots__ = ('items', 'capacity', 'start', 'size')
+
+    def __init__(self, capacity):
+        self.items = [None] * capacity
+        self.capacity = capacity
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('ring buffer index out of range')
+        return self.items[(self.start + index) % self.capacity]
+
+    def __iter__(self):
+        items, capacity, start = self.items, self.capacity, self.start
+        for i in range(self.size):
+            yield items[(start + i) % capacity]
+
+    def append(self, item):
+        if self.size < self.capacity:
+            self.items[(self.start + self.size) % self.capacity] = item
+            self.size += 1
+        else:
+            self.items[self.start] = item
+            self.start = (self.start + 1) % self.capacity
+
+    def popleft(self):
+        if not self.size:
+            raise IndexError('pop from empty ring buffer')
+        item = self.items[self.start]
+        self.items[self.start] = None
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+        return item
+
+    def clear(self):
+        for i in range(self.capacity):
+            self.items[i] = None
+        self.start = 0
+        self.size = 0
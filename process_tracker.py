@@ -0,0 +1,276 @@
+import os
+import time
+import math
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+# Result slot: one float64 sequence word, then per hand
+# x, y, speed, vx, vy, raw x, raw y (NaN for no hand / no detection)
+RESULT_FIELDS = 7
+
+def _tracker_worker(conn, result_name, max_hands, tracker_kwargs):
+    # Runs in its own process: one HandTracker (and MediaPipe graph) per camera.
+    # Frames are read straight out of the parent's shared ring, results go into
+    # the shared result slot, and the pipe only carries slot numbers. The
+    # parent owns (and unlinks) every shared block, the worker only maps them.
+    from hand_tracking import HandTracker
+    tracker = HandTracker(max_hands=max_hands, **tracker_kwargs)
+    result_block = shared_memory.SharedMemory(name=result_name)
+    result = np.ndarray((1 + max_hands * RESULT_FIELDS,), dtype=np.float64, buffer=result_block.buf)
+    ring_block = None
+    frames = []
+    conn.send_bytes(b'ready')
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        if message[0] == 'ring':
+            # A new ring of frame buffers (first frame, or the frame size changed)
+            _, name, shape, slots = message
+            frames = None
+            if ring_block is not None:
+                ring_block.close()
+            ring_block = shared_memory.SharedMemory(name=name)
+            size = int(np.prod(shape))
+            frames = [np.ndarray(shape, dtype=np.uint8, buffer=ring_block.buf, offset=i * size)
+                      for i in range(slots)]
+            continue
+        _, slot, sequence = message
+        values = np.full(max_hands * RESULT_FIELDS, math.nan)
+        try:
+            hands = tracker.get_hands(frames[slot])
+            for i, ((x, y, speed, velocity), raw) in enumerate(zip(hands, tracker.raw_points)):
+                base = i * RESULT_FIELDS
+                if x is not None:
+                    values[base:base + 5] = (x, y, speed, velocity[0], velocity[1])
+                if raw is not None:
+                    values[base + 5:base + 7] = raw
+        except Exception as e:
+            print(f"Error tracking hand: {e}")
+        # Seqlock: odd while writing, the request's even sequence once complete
+        result[0] = sequence * 2 - 1
+        result[1:] = values
+        result[0] = sequence * 2
+        conn.send_bytes(b'done')
+    if ring_block is not None:
+        frames = None
+        ring_block.close()
+    result = None
+    result_block.close()
+    conn.close()
+
+class ProcessTracker:
+    # Drop-in for HandTracker that runs inference in a dedicated worker
+    # process, so MediaPipe and its landmark handling never hold the render
+    # loop's GIL. Frames go through a ring of preallocated shared-memory
+    # buffers (one memcpy, no pickling) and the hands come back through a
+    # shared result slot. Tracking state stays in the worker, which is why
+    # this is one process per camera rather than a shared pool.
+    #
+    # A worker that dies or hangs is restarted; until the new one has loaded
+    # MediaPipe, get_hands() extrapolates the last hands it got for up to
+    # `max_coast` seconds and reports them lost after that. Restarts back off
+    # exponentially from `backoff` seconds, and after `max_restarts` failures
+    # in a row (a worker that can't even start) the tracker gives up and
+    # reports no hands.
+    def __init__(self, max_hands=1, slots=3, timeout=2.0, max_coast=0.25, backoff=0.5, max_restarts=5,
+                 **tracker_kwargs):
+        self.context = mp.get_context('spawn')  # MediaPipe is not fork-safe
+        self.max_hands = max_hands
+        self.slots = slots
+        self.timeout = timeout
+        self.max_coast = max_coast
+        self.tracker_kwargs = tracker_kwargs
+        self.backoff = backoff
+        self.max_restarts = max_restarts
+
+        self.result_block = shared_memory.SharedMemory(create=True, size=8 * (1 + max_hands * RESULT_FIELDS))
+        self.result = np.ndarray((1 + max_hands * RESULT_FIELDS,), dtype=np.float64, buffer=self.result_block.buf)
+        self.result[:] = 0
+        self.ring_block = None
+        self.frames = []
+        self.slot = 0
+        self.sequence = 0
+
+        self.raw_points = [None] * max_hands
+        self.last_hands = [(None, None, 0, (0, 0))] * max_hands
+        self.last_time = None
+        self.restarts = 0
+        self.failures = 0  # Restarts since the worker last answered a frame
+        self.restart_at = None  # When a backed-off restart is due
+        self.failed = False
+        self.process = None
+        self._spawn()
+
+    def _spawn(self):
+        # The worker re-imports the main module, one pygame banner is enough
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        self.conn, child = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_tracker_worker, args=(child, self.result_block.name, self.max_hands, self.tracker_kwargs),
+            name='hand-tracker', daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.ring_sent = False
+
+    def _stop_worker(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1.0)
+        self.conn.close()
+        self.process = None
+
+    def _restart(self, reason):
+        self._stop_worker()
+        if self.failures >= self.max_restarts:
+            print(f"Hand tracker process {reason}, giving up after {self.failures} restarts")
+            self.failed = True
+            return
+        delay = self.backoff * 2 ** self.failures
+        print(f"Hand tracker process {reason}, restarting in {delay:.1f}s")
+        self.failures += 1
+        self.restarts += 1
+        self.restart_at = time.perf_counter() + delay
+
+    def _allocate_ring(self, frame):
+        if self.ring_block is not None:
+            self.frames = []
+            self.ring_block.close()
+            self.ring_block.unlink()
+        self.ring_block = shared_memory.SharedMemory(create=True, size=frame.nbytes * self.slots)
+        self.frames = [np.ndarray(frame.shape, dtype=np.uint8, buffer=self.ring_block.buf, offset=i * frame.nbytes)
+                       for i in range(self.slots)]
+        self.ring_sent = False
+
+    @property
+    def raw_point(self):
+        return self.raw_points[0]
+
+    def predicted_hands(self):
+        # The last hands moved along their velocity (per-frame units at 30 fps,
+        # scaled by 1.5, see motion_model.frame_velocity)
+        if self.last_time is None:
+            return list(self.last_hands)
+        elapsed = time.perf_counter() - self.last_time
+        if elapsed > self.max_coast:
+            return [(None, None, 0, (0, 0))] * self.max_hands
+        hands = []
+        for x, y, speed, velocity in self.last_hands:
+            if x is None:
+                hands.append((x, y, speed, velocity))
+            else:
+                steps = elapsed * 30 / 1.5
+                hands.append((min(max(x + velocity[0] * steps, 0.0), 1.0),
+                              min(max(y + velocity[1] * steps, 0.0), 1.0), speed, velocity))
+        return hands
+
+    def _coast(self):
+        # No detection this frame: nothing for the motion model, predicted hands for the game
+        self.raw_points = [None] * self.max_hands
+        return self.predicted_hands()
+
+    def _receive_ready(self, timeout=0):
+        # Whether the worker has said it's ready (MediaPipe loaded), waiting up to `timeout`
+        try:
+            if not self.conn.poll(timeout):
+                return False
+            self.conn.recv_bytes()
+        except (EOFError, OSError):
+            self._restart("exited before it was ready")
+            return False
+        self.ready = True
+        return True
+
+    def wait_ready(self, timeout=None):
+        # Blocks until the worker can take frames, so a headless run's first
+        # frames don't depend on how long MediaPipe took to load
+        if self.failed or self.process is None:
+            return False
+        return self.ready or self._receive_ready(timeout)
+
+    def _read_result(self, sequence):
+        # Lock-free read of the result slot; None if it isn't this request's yet
+        while True:
+            before = self.result[0]
+            values = self.result[1:].copy()
+            if self.result[0] == before:
+                break
+        if before != sequence * 2:
+            return None
+        return values.reshape(self.max_hands, RESULT_FIELDS)
+
+    def get_hands(self, frame):
+        # Blocks until the worker answers (the GIL is released while waiting),
+        # or returns predicted hands while the worker is (re)starting
+        if self.failed:
+            self.raw_points = [None] * self.max_hands
+            return [(None, None, 0, (0, 0))] * self.max_hands
+        if self.process is None:
+            if time.perf_counter() < self.restart_at:
+                return self._coast()
+            self._spawn()
+        if not self.process.is_alive():
+            self._restart("exited")
+            return self._coast()
+        if not self.ready and not self._receive_ready():
+            return self._coast()
+
+        if self.ring_block is None or self.frames[0].shape != frame.shape:
+            self._allocate_ring(frame)
+        try:
+            if not self.ring_sent:
+                self.conn.send(('ring', self.ring_block.name, frame.shape, self.slots))
+                self.ring_sent = True
+            self.slot = (self.slot + 1) % self.slots
+            np.copyto(self.frames[self.slot], frame)
+            self.sequence += 1
+            self.conn.send(('frame', self.slot, self.sequence))
+            if not self.conn.poll(self.timeout):
+                self._restart("stopped answering")
+                return self._coast()
+            self.conn.recv_bytes()
+        except (BrokenPipeError, EOFError, OSError):
+            self._restart("crashed")
+            return self._coast()
+
+        self.failures = 0
+        values = self._read_result(self.sequence)
+        if values is None:
+            return self._coast()
+        hands = []
+        raw_points = []
+        for x, y, speed, vx, vy, raw_x, raw_y in values.tolist():
+            hands.append((None, None, 0, (0, 0)) if math.isnan(x) else (x, y, speed, (vx, vy)))
+            raw_points.append(None if math.isnan(raw_x) else (raw_x, raw_y))
+        self.raw_points = raw_points
+        self.last_hands = hands
+        self.last_time = time.perf_counter()
+        return hands
+
+    def get_hand_position(self, frame):
+        return self.get_hands(frame)[0]
+
+    def close(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                try:
+                    self.conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                self.process.join(timeout=2.0)
+                if self.process.is_alive():
+                    self.process.terminate()
+            self.conn.close()
+            self.process = None
+        self.frames = []
+        self.result = None
+        for block in (self.ring_block, self.result_block):
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.ring_block = self.result_block = None
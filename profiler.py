@@ -0,0 +1,148 @@
+import gc
+import sys
+import csv
+import json
+import time
+import pygame
+import numpy as np
+from collections import deque
+from asset_cache import assets
+
+class FrameProfiler:
+    # Per-stage frame timings. Stages are timed as laps: each lap() charges
+    # the time since the previous lap to the named stage. When disabled every
+    # call returns straight away.
+    def __init__(self, enabled=False, window=300, trace=False):
+        self.enabled = enabled
+        self.enable_pending = False
+        self.window = window
+        self.stages = []
+        self.samples = {}
+        self.current = {}
+        self.trace = [] if trace else None
+        self.frame_index = 0
+        self.frame_start = 0
+        self.last_lap = 0
+        self.alloc_start = 0
+        self.gc_start = 0
+
+        # Overlay text is re-rendered a few times a second, not every frame
+        self.show_overlay = False
+        self.overlay = None
+        self.overlay_refresh = 15
+
+    def _gc_collections(self):
+        return sum(stats['collections'] for stats in gc.get_stats())
+
+    def enable(self):
+        # Takes effect at the next begin_frame(): the frame already under way
+        # has no start time or allocation baseline to measure from
+        if not self.enabled:
+            self.enable_pending = True
+
+    def begin_frame(self):
+        if self.enable_pending:
+            self.enabled = True
+            self.enable_pending = False
+        if not self.enabled:
+            return
+        self.current = {}
+        self.alloc_start = sys.getallocatedblocks()
+        self.gc_start = self._gc_collections()
+        self.frame_start = self.last_lap = time.perf_counter()
+
+    def lap(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[stage] = self.current.get(stage, 0.0) + (now - self.last_lap) * 1000
+        self.last_lap = now
+
+    def record(self, stage, ms):
+        # Timings measured elsewhere, e.g. on the capture/inference threads
+        if not self.enabled:
+            return
+        self.current[stage] = ms
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.current['frame'] = (time.perf_counter() - self.frame_start) * 1000
+        allocations = sys.getallocatedblocks() - self.alloc_start
+        collections = self._gc_collections() - self.gc_start
+
+        for stage, ms in self.current.items():
+            history = self.samples.get(stage)
+            if history is None:
+                history = self.samples[stage] = deque(maxlen=self.window)
+                self.stages.append(stage)
+            history.append(ms)
+        for stage, value in (('alloc_blocks', allocations), ('gc_collections', collections)):
+            history = self.samples.get(stage)
+            if history is None:
+                history = self.samples[stage] = deque(maxlen=self.window)
+            history.append(value)
+
+        if self.trace is not None:
+            row = dict(self.current)
+            row['index'] = self.frame_index
+            row['alloc_blocks'] = allocations
+            row['gc_collections'] = collections
+            self.trace.append(row)
+        self.frame_index += 1
+
+    def percentiles(self, stage):
+        history = self.samples.get(stage)
+        if not history:
+            return 0.0, 0.0, 0.0
+        p50, p95, p99 = np.percentile(np.fromiter(history, dtype=np.float64), (50, 95, 99))
+        return p50, p95, p99
+
+    def summary(self):
+        result = {}
+        for stage in self.stages + ['alloc_blocks', 'gc_collections']:
+            if stage in self.samples:
+                p50, p95, p99 = self.percentiles(stage)
+                result[stage] = {'p50': p50, 'p95': p95, 'p99': p99}
+        return result
+
+    def draw(self, screen):
+        # Returns the overlay rectangle, or None when hidden
+        if not (self.enabled and self.show_overlay):
+            return None
+        if self.overlay is None or self.frame_index % self.overlay_refresh == 0:
+            self.overlay = self._render_overlay()
+        return screen.blit(self.overlay, (10, screen.get_height() - self.overlay.get_height() - 10))
+
+    def _render_overlay(self):
+        font = assets.font(None, 18)
+        lines = ['stage          p50     p95     p99 (ms)']
+        for stage in self.stages:
+            p50, p95, p99 = self.percentiles(stage)
+            lines.append(f'{stage:<12} {p50:7.2f} {p95:7.2f} {p99:7.2f}')
+        p50, p95, _ = self.percentiles('alloc_blocks')
+        lines.append(f'alloc blocks/frame  p50 {p50:.0f}  p95 {p95:.0f}')
+
+        rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 12
+        height = sum(surface.get_height() for surface in rendered) + 12
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        y = 6
+        for surface in rendered:
+            overlay.blit(surface, (6, y))
+            y += surface.get_height()
+        return overlay
+
+    def export(self, path):
+        # Per-frame trace as CSV or JSON, picked by file extension
+        rows = self.trace or []
+        columns = ['index'] + self.stages + ['alloc_blocks', 'gc_collections']
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'stages': self.stages, 'summary': self.summary(), 'frames': rows}, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval='')
+                writer.writeheader()
+                writer.writerows(rows)
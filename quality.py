@@ -0,0 +1,98 @@
+import numpy as np
+
+# Visual quality tiers, best first. Each knob is read by the subsystem that
+# owns it when FruitNinja.apply_quality() hands the tier out:
+#   particles      juice particles per sliced fruit (Fruit)
+#   trail_layers   blade trail layers, thin core first (BladeTrail)
+#   katana_ghosts  fading katana copies behind the cursor (GameEngine)
+#   glow_passes    offset copies drawn for the score glow (draw_ui)
+#   preview_fps    cap on camera preview refreshes per second, 0 for none;
+#                  the --preview-fps setting applies under it (CameraPreview)
+#   max_inference_level  largest hand tracking input, see HandTracker.resolutions
+QUALITY_TIERS = [
+    {'name': 'high', 'particles': 25, 'trail_layers': 3, 'katana_ghosts': 2, 'glow_passes': 4,
+     'preview_fps': 0, 'max_inference_level': 3},
+    {'name': 'medium', 'particles': 15, 'trail_layers': 2, 'katana_ghosts': 1, 'glow_passes': 2,
+     'preview_fps': 15, 'max_inference_level': 2},
+    {'name': 'low', 'particles': 8, 'trail_layers': 1, 'katana_ghosts': 0, 'glow_passes': 1,
+     'preview_fps': 10, 'max_inference_level': 1},
+    {'name': 'minimal', 'particles': 4, 'trail_layers': 1, 'katana_ghosts': 0, 'glow_passes': 0,
+     'preview_fps': 5, 'max_inference_level': 0}
+]
+
+def tier_index(name):
+    for i, tier in enumerate(QUALITY_TIERS):
+        if tier['name'] == name:
+            return i
+    raise ValueError(f"Unknown quality tier {name!r}")
+
+def capped_rate(rate, cap):
+    # The lower of two rates, where 0 means unlimited
+    if not cap:
+        return rate
+    if not rate:
+        return cap
+    return min(rate, cap)
+
+class QualityGovernor:
+    # Picks a quality tier from measured frame times (the work of a frame,
+    # without the wait for the next tick). Drops a tier as soon as the 90th
+    # percentile of a short window goes over `drop_at` of the frame budget,
+    # and only climbs back after a longer window stays under `raise_at`.
+    # Every time a raise has to be undone the wait before the next raise
+    # doubles, so a machine right on the edge settles instead of flipping
+    # back and forth.
+    def __init__(self, target_fps=60, tier=0, drop_at=0.9, raise_at=0.6,
+                 drop_window=30, raise_window=180, warmup=60):
+        self.budget_ms = 1000.0 / target_fps
+        self.tier = tier
+        self.drop_at = drop_at
+        self.raise_at = raise_at
+        self.drop_window = drop_window
+        self.raise_window = raise_window
+        self.raise_wait = raise_window
+        self.warmup = warmup  # Frames ignored at the start (asset warm-up, first camera frames)
+        self.samples = np.zeros(max(drop_window, raise_window * 8))
+        self.count = 0
+        self.last_raise = None  # Frame of the last raise, to spot raises that didn't hold
+        self.frame = 0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    def _recent(self, frames):
+        frames = min(frames, self.count)
+        end = self.count % len(self.samples)
+        if frames <= end:
+            return self.samples[end - frames:end]
+        return np.concatenate((self.samples[end - frames:], self.samples[:end]))
+
+    def observe(self, work_ms):
+        # Feed one frame's time; True when the tier changed
+        self.frame += 1
+        if self.frame <= self.warmup:
+            return False
+        self.samples[self.count % len(self.samples)] = work_ms
+        self.count += 1
+
+        if self.count >= self.drop_window and self.tier < len(QUALITY_TIERS) - 1:
+            if np.percentile(self._recent(self.drop_window), 90) > self.budget_ms * self.drop_at:
+                # A raise that falls over this quickly was one step too far
+                if self.last_raise is not None and self.frame - self.last_raise < self.raise_wait * 2:
+                    self.raise_wait = min(self.raise_wait * 2, len(self.samples))
+                self.last_raise = None
+                return self._step(1)
+
+        if self.count >= self.raise_wait and self.tier > 0:
+            if np.percentile(self._recent(self.raise_wait), 90) < self.budget_ms * self.raise_at:
+                self.last_raise = self.frame
+                return self._step(-1)
+        return False
+
+    def _step(self, direction):
+        self.tier += direction
+        self.count = 0  # The new tier is judged on its own frames
+        self.changes += 1
+        return True
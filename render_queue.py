@@ -0,0 +1,107 @@
+import pygame
+
+# Draw layers, back to front. Gaps leave room for sub-layers: blade trail
+# layer i draws its glow at LAYER_BLADES + 2 * i and the trail over it at + 1.
+LAYER_BLADES = 10
+LAYER_KATANA = 20
+LAYER_PREVIEW = 30
+LAYER_PARTICLES = 40
+LAYER_FRUITS = 50
+LAYER_UI = 60
+
+# Layers where it doesn't matter which of two overlapping sprites lands on
+# top (juice drops), so their blits can be regrouped by source surface. Every
+# other layer is drawn in submission order, which is its z-order.
+UNORDERED_LAYERS = {LAYER_PARTICLES}
+
+class RenderQueue:
+    # Collects a frame's blits instead of issuing them as the game code runs.
+    # Blits that miss the screen are culled on submit; flush() then draws each
+    # layer with a single Surface.blits() call, back to front, grouping the
+    # blits of UNORDERED_LAYERS by source surface on the way.
+    # Sources must not change between submit() and flush().
+    def __init__(self, screen):
+        self.layers = {}  # layer -> [(source, dest, area, special_flags)], lists reused every frame
+        self.set_target(screen)
+        self.pixels = 0
+
+        # Totals since the start, and the last frame's counts
+        self.frames = 0
+        self.submitted = 0
+        self.culled = 0
+        self.draw_calls = 0
+        self.blitted_pixels = 0
+        self.last_culled = 0
+        self.last_frame = {'submitted': 0, 'culled': 0, 'draw_calls': 0, 'overdraw': 0.0}
+
+    def set_target(self, screen):
+        self.screen = screen
+        self.bounds = screen.get_rect()
+
+    def _commands(self, layer):
+        commands = self.layers.get(layer)
+        if commands is None:
+            commands = self.layers[layer] = []
+        return commands
+
+    def submit(self, layer, surface, dest, area=None, special_flags=0):
+        # dest is a position or a Rect (its topleft, as with blit). Returns the
+        # on-screen rectangle the blit will cover, or None if it was culled.
+        width, height = area.size if area is not None else surface.get_size()
+        rect = pygame.Rect(dest[0], dest[1], width, height).clip(self.bounds)
+        if not rect.width or not rect.height:
+            self.culled += 1
+            return None
+        self._commands(layer).append((surface, dest, area, special_flags))
+        self.submitted += 1
+        self.pixels += rect.width * rect.height
+        return rect
+
+    def submit_batch(self, layer, blits, pixels=0, culled=0):
+        # (source, dest) pairs taken as they are, without culling each one (SDL
+        # clips them anyway), e.g. the particle pool's sprites. `pixels` is
+        # their total area, for the overdraw count, and `culled` how many the
+        # caller already dropped as off-screen
+        self._commands(layer).extend(blits)
+        self.submitted += len(blits)
+        self.culled += culled
+        self.pixels += pixels
+
+    def flush(self):
+        blits = self.screen.blits
+        frame_calls = 0
+        frame_submitted = 0
+        for layer in sorted(self.layers):
+            commands = self.layers[layer]
+            if not commands:
+                continue
+            if layer in UNORDERED_LAYERS:
+                commands.sort(key=lambda command: id(command[0]))
+            blits(commands, False)
+            frame_calls += 1
+            frame_submitted += len(commands)
+            commands.clear()
+
+        area = self.bounds.width * self.bounds.height
+        self.last_frame = {
+            'submitted': frame_submitted,
+            'culled': self.culled - self.last_culled,
+            'draw_calls': frame_calls,
+            'overdraw': self.pixels / area if area else 0.0
+        }
+        self.last_culled = self.culled
+        self.frames += 1
+        self.draw_calls += frame_calls
+        self.blitted_pixels += self.pixels
+        self.pixels = 0
+
+    def stats(self):
+        # Per-frame averages since the start
+        frames = max(self.frames, 1)
+        area = self.bounds.width * self.bounds.height
+        return {
+            'blits_per_frame': self.submitted / frames,
+            'culled_per_frame': self.culled / frames,
+            'draw_calls_per_frame': self.draw_calls / frames,
+            'overdraw': self.blitted_pixels / (area * frames) if area else 0.0
+        }
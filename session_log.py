@@ -0,0 +1,110 @@
+import os
+import math
+import struct
+import zlib
+import numpy as np
+
+# File layout: one 48-byte header, then fixed-size little-endian records
+# appended one per rendered frame, so a log can be memory-mapped as a NumPy
+# structured array and a crash only ever loses the last partial record.
+MAGIC = b'FNSL'
+VERSION = 4  # 2: fruits follow closed-form, time-based flights (FruitWorld), 3: fruit limits, 4: playfield size
+# magic, version, players, seed, fps, min/max fruits, render size (0x0 without one), monitor size
+HEADER = struct.Struct('<4sHHQfIIHHHH12x')
+
+# Record flags
+FLAG_FULLSCREEN = 1
+
+def record_dtype(players):
+    return np.dtype([
+        ('frame', '<u4'),
+        ('ticks', '<u4'),  # Game clock at the start of the frame
+        ('frame_ms', '<f4'),  # Wall time of the previous frame
+        ('latency_ms', '<f4'),  # Capture-to-render latency of the first camera
+        ('flags', 'u1'),
+        ('new', 'u1', (players,)),  # Whether each player's hand sample was fresh
+        ('hands', '<f8', (players, 5)),  # x, y, speed, vx, vy per player, NaN without a hand
+        ('score', '<u4'),
+        ('state', '<u4')  # CRC32 of the fruit state after the frame, see state_hash()
+    ])
+
+def state_hash(state):
+    # state: float32 (x, y, sliced) rows, see FruitWorld.state()
+    return zlib.crc32(np.ascontiguousarray(state, dtype=np.float32).tobytes())
+
+class SessionRecorder:
+    # Appends one record per frame; buffered, flushed every `flush_every` frames
+    def __init__(self, path, players, seed, fps=60, min_fruits=3, max_fruits=8, render_size=None,
+                 monitor_size=(0, 0), flush_every=60):
+        self.path = path
+        self.players = players
+        self.flush_every = flush_every
+        self.record = np.zeros(1, dtype=record_dtype(players))
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, players, seed, fps, min_fruits, max_fruits,
+                                    *(render_size or (0, 0)), *monitor_size))
+        self.count = 0
+
+    def append(self, frame, ticks, frame_ms, latency_ms, flags, player_inputs, score, state):
+        # player_inputs: ((x, y, speed, (vx, vy)), is_new) per player
+        record = self.record[0]
+        record['frame'] = frame
+        record['ticks'] = ticks
+        record['frame_ms'] = frame_ms
+        record['latency_ms'] = latency_ms
+        record['flags'] = flags
+        for i, ((x, y, speed, velocity), is_new) in enumerate(player_inputs):
+            record['new'][i] = is_new
+            if x is None:
+                record['hands'][i] = math.nan
+            else:
+                record['hands'][i] = (x, y, speed, velocity[0], velocity[1])
+        record['score'] = score
+        record['state'] = state
+        self.file.write(self.record.tobytes())
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+class SessionLog:
+    # Read-only, memory-mapped view of a recorded session
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            (magic, version, players, seed, fps, min_fruits, max_fruits,
+             render_width, render_height, monitor_width, monitor_height) = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a session log (version {VERSION})")
+        self.path = path
+        self.players = players
+        self.seed = seed
+        self.fps = fps
+        self.min_fruits = min_fruits
+        self.max_fruits = max_fruits
+        # The playfield: the fixed render size if there was one, and the
+        # monitor size fullscreen frames were played at
+        self.render_size = (render_width, render_height) if render_width else None
+        self.monitor_size = (monitor_width, monitor_height)
+        dtype = record_dtype(players)
+        count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def player_inputs(self, index):
+        # Same shape SessionRecorder.append() took
+        record = self.records[index]
+        inputs = []
+        for hand, is_new in zip(record['hands'].tolist(), record['new'].tolist()):
+            if math.isnan(hand[0]):
+                inputs.append(((None, None, 0, (0, 0)), bool(is_new)))
+            else:
+                inputs.append(((hand[0], hand[1], hand[2], (hand[3], hand[4])), bool(is_new)))
+        return inputs
@@ -0,0 +1,57 @@
+import pygame
+import threading
+from collections import OrderedDict
+
+class RotationAtlas:
+    # Rotated copies of sprites at quantized angles, filled on first use and
+    # kept under a memory budget with least-recently-used eviction
+    def __init__(self, step=2, max_bytes=96 * 1024 * 1024):
+        self.step = step
+        self.steps = int(round(360 / step))
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.entries = OrderedDict()
+        self.derived_sprites = {}
+        self.lock = threading.Lock()  # Startup tasks prewarm from several worker threads
+        self.hits = 0
+        self.misses = 0
+
+    def rotated(self, key, surface, angle):
+        index = int(round(angle / self.step)) % self.steps
+        entry_key = (key, index)
+        sprite = self.entries.get(entry_key)
+        if sprite is not None:
+            self.hits += 1
+            self.entries.move_to_end(entry_key)
+            return sprite
+
+        self.misses += 1
+        sprite = pygame.transform.rotate(surface, index * self.step)
+        self.entries[entry_key] = sprite
+        self.bytes_used += sprite.get_width() * sprite.get_height() * 4
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes_used -= old.get_width() * old.get_height() * 4
+        return sprite
+
+    def derived(self, key, build):
+        # Unrotated variants (fruit halves, faded ghosts) built once per key
+        sprite = self.derived_sprites.get(key)
+        if sprite is None:
+            sprite = build()
+            self.derived_sprites[key] = sprite
+        return sprite
+
+    def prewarm(self, key, surface):
+        # Every angle of a sprite up front, so the game never rotates it mid-frame
+        with self.lock:
+            for index in range(self.steps):
+                self.rotated(key, surface, index * self.step)
+
+    def clear(self):
+        self.entries.clear()
+        self.derived_sprites.clear()
+        self.bytes_used = 0
+
+# Shared by fruits, fruit halves and the katana cursor
+rotations = RotationAtlas()
@@ -0,0 +1,99 @@
+import time
+import threading
+import pygame
+from concurrent.futures import ThreadPoolExecutor, wait
+from asset_cache import assets
+
+class StartupLoader:
+    # Runs startup tasks on worker threads and keeps a timeline of every phase,
+    # in milliseconds since `origin` (a perf_counter() taken at program start)
+    def __init__(self, origin=None, workers=4):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='startup')
+        self.tasks = {}
+        self.phases = {}  # name -> [start_ms, end_ms or None]
+        self.lock = threading.Lock()
+
+    def now_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    def record(self, name, start_ms, end_ms=None):
+        with self.lock:
+            self.phases[name] = [start_ms, self.now_ms() if end_ms is None else end_ms]
+
+    def submit(self, name, fn, *args, **kwargs):
+        def task():
+            with self.lock:
+                self.phases[name] = [self.now_ms(), None]
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.phases[name][1] = self.now_ms()
+        self.tasks[name] = self.executor.submit(task)
+        return self.tasks[name]
+
+    def done(self, names):
+        return all(self.tasks[name].done() for name in names)
+
+    def result(self, name):
+        # Re-raises whatever the task raised
+        return self.tasks[name].result()
+
+    def progress(self, names):
+        finished = [name for name in names if self.tasks[name].done()]
+        pending = [name for name in names if not self.tasks[name].done()]
+        return len(finished), len(names), pending
+
+    def wait(self, names, on_tick=None, interval=1 / 30):
+        # Blocks until the named tasks finish, calling on_tick() every interval
+        # meanwhile (to keep a loading screen animated)
+        futures = [self.tasks[name] for name in names]
+        while True:
+            if on_tick is not None:
+                on_tick()
+            _, pending = wait(futures, timeout=interval)
+            if not pending:
+                break
+        return [future.result() for future in futures]
+
+    def summary(self):
+        with self.lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+        return {name: {'start_ms': start, 'end_ms': end, 'ms': (end - start) if end is not None else None}
+                for name, (start, end) in phases}
+
+    def log(self):
+        parts = []
+        for name, phase in self.summary().items():
+            if phase['end_ms'] is None:
+                parts.append(f"{name} (running)")
+            elif phase['ms'] < 0.5:
+                parts.append(f"{name} @{phase['end_ms']:.0f}")
+            else:
+                parts.append(f"{name} {phase['start_ms']:.0f}-{phase['end_ms']:.0f}")
+        print("Startup (ms): " + ", ".join(parts))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+def draw_loading_screen(screen, loader, names, title="Fruit Ninja"):
+    # Title, progress bar and whatever is still loading
+    width, height = screen.get_size()
+    screen.fill((20, 20, 50))
+    finished, total, pending = loader.progress(names)
+
+    title_surface = assets.font(None, 72).render(title, True, (255, 255, 255))
+    screen.blit(title_surface, title_surface.get_rect(center=(width // 2, height // 2 - 60)))
+
+    bar = pygame.Rect(0, 0, width // 2, 16)
+    bar.center = (width // 2, height // 2 + 10)
+    pygame.draw.rect(screen, (60, 60, 90), bar, border_radius=8)
+    if finished:
+        fill = bar.copy()
+        fill.width = bar.width * finished // max(total, 1)
+        pygame.draw.rect(screen, (100, 200, 255), fill, border_radius=8)
+
+    status = "Loading " + ", ".join(pending) + "..." if pending else "Ready"
+    status_surface = assets.font(None, 28).render(status, True, (180, 180, 200))
+    screen.blit(status_surface, status_surface.get_rect(center=(width // 2, height // 2 + 50)))
@@ -0,0 +1,93 @@
+import pygame
+from collections import OrderedDict
+
+class TextCache:
+    # Fonts by size (LRU), glyphs rendered once per font/color/character, and
+    # composed strings that are only rebuilt when their text changes
+    def __init__(self, max_fonts=8):
+        self.max_fonts = max_fonts
+        self.fonts = OrderedDict()
+        self.glyphs = {}
+        self.slots = {}
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.fonts.move_to_end(key)
+            return font
+        try:
+            font = pygame.font.Font(path, size)
+        except Exception:
+            font = pygame.font.Font(None, size)
+        self.fonts[key] = font
+        if len(self.fonts) > self.max_fonts:
+            old_key, _ = self.fonts.popitem(last=False)
+            self.glyphs = {k: v for k, v in self.glyphs.items() if k[:2] != old_key}
+        return font
+
+    def glyph(self, path, size, color, char):
+        key = (path, size, color, char)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            surface = self.font(path, size).render(char, True, color)
+            self.glyphs[key] = surface
+        return surface
+
+    def compose(self, path, size, color, text):
+        glyphs = [self.glyph(path, size, color, char) for char in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        height = max((glyph.get_height() for glyph in glyphs), default=0)
+        surface = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+        x = 0
+        for glyph in glyphs:
+            surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return surface
+
+    def text(self, path, size, color, text, owner=None):
+        # One cached surface per (font, size, color, owner) slot, rebuilt when
+        # the text changes; `owner` keeps labels drawn in the same style (one
+        # score per player) from evicting each other every frame
+        slot = (path, size, color, owner)
+        cached = self.slots.get(slot)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        surface = self.compose(path, size, color, text)
+        self.slots[slot] = (text, surface)
+        return surface
+
+    def clear(self):
+        self.fonts.clear()
+        self.glyphs.clear()
+        self.slots.clear()
+
+class PulseText:
+    # Pre-scaled animation frames for a pulsing label such as the combo counter
+    def __init__(self, cache, path, size, color, min_scale=0.9, max_scale=1.1, steps=21):
+        self.cache = cache
+        self.path = path
+        self.size = size
+        self.color = color
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.steps = steps
+        self.key = None
+        self.frames = []
+
+    def frame(self, text, scale, scale_x=1.0, scale_y=1.0):
+        key = (text, scale_x, scale_y)
+        if key != self.key:
+            base = self.cache.compose(self.path, self.size, self.color, text)
+            self.frames = []
+            for i in range(self.steps):
+                s = self.min_scale + (self.max_scale - self.min_scale) * i / (self.steps - 1)
+                self.frames.append(pygame.transform.scale(
+                    base, (int(base.get_width() * s * scale_x), int(base.get_height() * s * scale_y))))
+            self.key = key
+        t = (scale - self.min_scale) / (self.max_scale - self.min_scale)
+        index = min(max(int(round(t * (self.steps - 1))), 0), self.steps - 1)
+        return self.frames[index]
+
+# Shared by the game UI and the engine's HUD
+text_cache = TextCache()